@@ -98,6 +98,7 @@ def _schedule_home_ops(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
             "kind": kind,
             "title": title,
             "scheduledAt": scheduled.isoformat(),
+            "scheduled_epoch": scheduled.timestamp(),  # pre-parsed for tick comparisons
             "dueAt": due.isoformat(),
             "status": "scheduled",
             "notes": notes,
@@ -108,6 +109,8 @@ def _schedule_home_ops(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
     add("wifi_access", "Set up guest Wi‑Fi and QR code", timedelta(hours=-2), 30, "Generate guest SSID and print QR")
     add("secure_locks", "Secure door locks after guests leave", timedelta(hours=3), 10, "Ensure all smart locks are engaged")
     add("post_cleanup", "Post-party cleanup and robot vacuum run", timedelta(hours=4), 60, "Run robot vacuum; tidy kitchen and living room")
+    # Kept in schedule order so tick_timeline can stop at the first future task
+    tasks.sort(key=lambda t: t["scheduled_epoch"])
     return tasks
 
 
@@ -216,9 +219,9 @@ def node_send_invites(state: BirthdayState):
         new_state = dict(state); new_state["plan"] = plan
         return new_state
     invitees = plan.get("invitees", [])
-    msg = (plan.get("invite_message_template") or "").replace("{name}", "Friend").format(
-        spouse=plan.get("spouse_name","Spouse"), date=plan.get("date",""), venue=plan.get("venue",""), time=plan.get("time",""), rsvp="https://example.com/rsvp"
-    )
+    msg = compose_message(plan.get("invite_message_template") or "", {
+        "name": "Friend", "spouse": plan.get("spouse_name","Spouse"), "date": plan.get("date",""), "venue": plan.get("venue",""), "time": plan.get("time",""), "rsvp": "https://example.com/rsvp",
+    })
     result = send_invites(invitees, msg)
     plan["invite_result"] = result
     plan["stage"] = "sent"
@@ -191,41 +191,41 @@ def router_order(profile: Dict[str, Any], ctx: Dict[str, Any]) -> List[str]:
 # ---------------- Node wrappers ----------------
 
 def node_getting_started(state: PlannerState):
-    card = getting_started.run(state["profile"], state.get("request", {})); state.setdefault("outputs", {}).setdefault("cards", []).append(card.dict()); return state
+    card = getting_started.run(state["profile"], state.get("request", {})); state.setdefault("outputs", {}).setdefault("cards", []).append(card.model_dump()); return state
 
 def node_traffic(state: PlannerState):
-    card = traffic.run(state["profile"], state.get("request", {})); state["outputs"]["cards"].append(card.dict()); return state
+    card = traffic.run(state["profile"], state.get("request", {})); state["outputs"]["cards"].append(card.model_dump()); return state
 
 def node_work_life(state: PlannerState):
-    card = work_life.run(state["profile"], state.get("request", {})); state["outputs"]["cards"].append(card.dict()); return state
+    card = work_life.run(state["profile"], state.get("request", {})); state["outputs"]["cards"].append(card.model_dump()); return state
 
 def node_fitness(state: PlannerState):
-    card = fitness.run(state["profile"], state.get("request", {})); state["outputs"]["cards"].append(card.dict()); return state
+    card = fitness.run(state["profile"], state.get("request", {})); state["outputs"]["cards"].append(card.model_dump()); return state
 
 def node_hobby(state: PlannerState):
-    card = hobby.run(state["profile"], state.get("request", {})); state["outputs"]["cards"].append(card.dict()); return state
+    card = hobby.run(state["profile"], state.get("request", {})); state["outputs"]["cards"].append(card.model_dump()); return state
 
 def node_life_after_work(state: PlannerState):
-    card = life_after_work.run(state["profile"], state.get("request", {})); state["outputs"]["cards"].append(card.dict()); return state
+    card = life_after_work.run(state["profile"], state.get("request", {})); state["outputs"]["cards"].append(card.model_dump()); return state
 
 def node_relaxation(state: PlannerState):
-    card = relaxation.run(state["profile"], state.get("request", {})); state["outputs"]["cards"].append(card.dict()); return state
+    card = relaxation.run(state["profile"], state.get("request", {})); state["outputs"]["cards"].append(card.model_dump()); return state
 
 # New node wrappers
 
 def node_nutrition(state: PlannerState):
-    card = nutrition.run(state["profile"], state.get("request", {})); state["outputs"]["cards"].append(card.dict()); return state
+    card = nutrition.run(state["profile"], state.get("request", {})); state["outputs"]["cards"].append(card.model_dump()); return state
 
 def node_finance_errands(state: PlannerState):
-    card = finance_errands.run(state["profile"], state.get("request", {})); state["outputs"]["cards"].append(card.dict()); return state
+    card = finance_errands.run(state["profile"], state.get("request", {})); state["outputs"]["cards"].append(card.model_dump()); return state
 
 def node_learning(state: PlannerState):
-    card = learning.run(state["profile"], state.get("request", {})); state["outputs"]["cards"].append(card.dict()); return state
+    card = learning.run(state["profile"], state.get("request", {})); state["outputs"]["cards"].append(card.model_dump()); return state
 
 def node_celebrations(state: PlannerState):
     card = celebrations.run(state["profile"], state.get("request", {}))
     if card:
-        state["outputs"]["cards"].append(card.dict())
+        state["outputs"]["cards"].append(card.model_dump())
     return state
 
 # Home ops node: turns completed ops tasks into cards
@@ -239,7 +239,7 @@ def node_home_ops(state: PlannerState):
         kind = r.get("kind")
         result = r.get("result", {})
         card = home_ops.run(state["profile"], {"kind": kind, "result": result})
-        state["outputs"]["cards"].append(card.dict())
+        state["outputs"]["cards"].append(card.model_dump())
     return state
 
 # ---------------- Prompt helpers ----------------
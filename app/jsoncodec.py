@@ -0,0 +1,29 @@
+from typing import Any
+import json
+
+
+def _import_orjson():
+    try:
+        import orjson  # type: ignore
+        return orjson
+    except Exception:
+        return None
+
+
+_orjson = _import_orjson()
+
+
+def dumps(value: Any) -> Any:
+    # orjson bytes when available (non-str keys stringified like json.dumps does), stdlib json str otherwise
+    if _orjson is not None:
+        return _orjson.dumps(value, default=str, option=_orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=str)
+
+
+def dumps_str(value: Any) -> str:
+    out = dumps(value)
+    return out.decode() if isinstance(out, bytes) else out
+
+
+def loads(raw: Any) -> Any:
+    return _orjson.loads(raw) if _orjson is not None else json.loads(raw)
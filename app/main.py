@@ -1,20 +1,81 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Depends, Header
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from datetime import datetime, timedelta, date as _date
-import json, asyncio, importlib, os
-from app.schemas import PlanRequest, PlanResponse, AgentRunRequest, BirthdayPlanRequest, UpsertProfileRequest
-from app.schemas import AgentCard
+import json, asyncio, logging, os, re, secrets, threading, time
+from app.schemas import PlanRequest, PlanResponse, AgentRunRequest, BirthdayPlanRequest, BirthdayPlanResponse, UpsertProfileRequest
+from app.schemas import AgentCard, WsPlanDayRequest
 from app.profiles.demo import DEMO_PROFILES
+from app.profiles.model import Profile
 from app.graphs.supervisor import SUPERVISOR_GRAPH, NODE_FUN, LINEAR_A, LINEAR_B, compute_day_context, router_order, supervisor_insights, make_supervisor_bullets_prompt
 from app.graphs.birthday import BIRTHDAY_GRAPH
-from typing import Dict, Any, Optional, List, Tuple
-from app.schemas import NaturalCommandRequest, NaturalCommandResponse, BuildPromptRequest, BuildPromptResponse
+from typing import Dict, Any, Mapping, Optional, List, Tuple
+from app.schemas import NaturalCommandRequest, NaturalCommandResponse, NaturalPlanResponse, BuildPromptRequest, BuildPromptResponse
 from app.llm.llm import interpret_nl, build_interpret_nl_prompt, build_bullets_prompt
-from app.tools.comms import rewrite_invite_template, compose_message, render_invite_preview, build_rewrite_invite_prompt
+from app.tools.comms import rewrite_invite_template, compose_message, render_invite_preview, build_rewrite_invite_prompt, cache_stats as comms_cache_stats
 from app.settings import settings
+from app.plan_store import MemoryPlanStore, make_plan_store
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.staticfiles import StaticFiles
+from pydantic import ValidationError
+from bisect import bisect_left
+from calendar import isleap
+from collections import ChainMap, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache, partial
+from itertools import chain
+from operator import itemgetter
+from types import MappingProxyType
 
-app = FastAPI(title="Agentic Day Planner (LangGraph + Gemini)")
+logger = logging.getLogger(__name__)
+
+# Synthetic profile used only to exercise the graphs/nodes once at startup
+_WARM_PROFILE: Dict[str, Any] = {"meta": {"role": "warmup"}, "days": {"Day_1": {"09:00": "Standup"}}}
+
+
+def _warmup() -> None:
+    """Run each graph/node once so the first real request doesn't pay lazy init costs."""
+    config = {"configurable": {"thread_id": "__warmup__", "checkpoint_ns": "birthday"}}
+    BIRTHDAY_GRAPH.invoke({"messages": [], "profile": _WARM_PROFILE, "params": {}, "plan": {}}, config=config)
+    for node in NODE_FUN.values():
+        node({"profile": _WARM_PROFILE, "request": {}, "outputs": {"cards": []}})
+
+
+def _make_work_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=settings.WORK_POOL_SIZE, thread_name_prefix="work")
+
+
+# Dedicated, bounded pool for sync graph/agent/LLM/Places work so bursts queue here
+# instead of exhausting the default executor; the semaphore caps how many calls are
+# handed to it at once, so excess callers wait on the loop rather than in its queue
+_WORK_POOL = _make_work_pool()
+_WORK_SEM = asyncio.Semaphore(settings.WORK_MAX_PENDING)
+
+
+async def _offload(fn: Any, *args: Any, **kwargs: Any) -> Any:
+    async with _WORK_SEM:
+        return await asyncio.get_running_loop().run_in_executor(_WORK_POOL, partial(fn, *args, **kwargs))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _WORK_POOL, _WORK_SEM
+    if settings.WARMUP_ENABLED:
+        try:
+            await _offload(_warmup)
+        except Exception:
+            # Non-fatal: the first real request just pays the lazy init instead
+            logger.warning("Startup warmup failed", exc_info=True)
+    yield
+    # Don't leak worker threads across reloads/shutdown; the replacements spawn no threads and
+    # bind no loop unless the app is started again (e.g. a second TestClient)
+    pool, _WORK_POOL = _WORK_POOL, _make_work_pool()
+    _WORK_SEM = asyncio.Semaphore(settings.WORK_MAX_PENDING)
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(title="Agentic Day Planner (LangGraph + Gemini)", lifespan=lifespan)
 
 # Permissive CORS (dev): allow all origins, methods, and headers
 app.add_middleware(
@@ -24,91 +85,94 @@ app.add_middleware(
     allow_headers=["*"],
     allow_credentials=False,
 )
+# Plan/card payloads are several kB of JSON; SSE (text/event-stream) is excluded by Starlette
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
-# Serve static files for quick test UI (optional)
-try:
-    STATIC_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "static"))
-    if os.path.isdir(STATIC_DIR):
-        _sf = importlib.import_module("starlette.staticfiles")
-        app.mount("/static", _sf.StaticFiles(directory=STATIC_DIR), name="static")
-except Exception:
-    pass
+# Serve static files for quick test UI (optional; STATIC_ENABLED=false skips the mount)
+STATIC_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "static"))
+if settings.STATIC_ENABLED and os.path.isdir(STATIC_DIR):
+    app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 # ---------------- Simple in-memory persistence ----------------
-PLAN_STORE: Dict[str, Dict[str, Any]] = {}
+PLAN_STORE = make_plan_store()
+
+
+async def _store_io(fn: Any, *args: Any) -> Any:
+    """Run a plan-store call from async code: inline for the in-memory store, on the work pool
+    for Redis so its network round trips never block the event loop."""
+    if isinstance(PLAN_STORE, MemoryPlanStore):
+        return fn(*args)
+    return await _offload(fn, *args)
+
+# Typed profile views, kept in sync with DEMO_PROFILES by upsert_profile
+PROFILES: Dict[str, Profile] = {pid: Profile.from_json(pid, p) for pid, p in DEMO_PROFILES.items()}
 
 # Helper: derive spouse name from profile metadata
-_def_spouse_tokens = {"spouse", "wife", "husband", "partner"}
+_def_spouse_tokens = frozenset({"spouse", "wife", "husband", "partner"})
 
 
-def _derive_spouse_name(profile: Dict[str, Any]) -> Optional[str]:
-    try:
-        fam = (profile or {}).get("meta", {}).get("family", [])
-        for m in fam:
-            rel = (m.get("relation") or "").strip().lower()
-            if rel in _def_spouse_tokens:
-                return m.get("name")
-    except Exception:
-        pass
-    return None
+# Memoized per profile_id; upsert_profile clears the cache
 
-# Parse MM-DD or YYYY-MM-DD into a date in the next `horizon_days` days, else None
+@lru_cache(maxsize=1024)
+def _derive_spouse_name(profile_id: str) -> Optional[str]:
+    return next((m.name for m in PROFILES[profile_id].family if m.relation_norm in _def_spouse_tokens), None)
 
-def _parse_upcoming(date_str: str, today: _date, horizon_days: int = 60) -> Optional[_date]:
-    try:
-        if len(date_str) == 10:
-            dt = datetime.fromisoformat(date_str).date()
-        else:
-            dt = datetime.fromisoformat(f"{today.year}-{date_str}").date()
-        # If already passed this year, consider next year
-        if dt < today:
-            try:
-                dt = datetime.fromisoformat(f"{today.year + 1}-{date_str}").date()
-            except Exception:
-                pass
-        if 0 <= (dt - today).days <= horizon_days:
-            return dt
-    except Exception:
+# Next occurrence of a pre-parsed birthday within `horizon_days`, else None.
+# Full YYYY-MM-DD dates are pinned to their year; MM-DD rolls over to next year.
+
+def _parse_upcoming(md: Tuple[int, int], year: Optional[int], today: _date, horizon_days: int = 60) -> Optional[_date]:
+    m, d = md
+    y = year if year is not None else today.year
+    # md was validated against a leap year at parse time, so only Feb 29 can be out of range
+    if m == 2 and d == 29 and not isleap(y):
         return None
+    t = today.toordinal(); n = _date(y, m, d).toordinal()
+    if n < t and year is None:
+        if m == 2 and d == 29 and not isleap(y + 1):
+            return None
+        n = _date(y + 1, m, d).toordinal()
+    if 0 <= n - t <= horizon_days:
+        return _date.fromordinal(n)
     return None
 
 
-def _pick_upcoming_birthday(profile: Dict[str, Any], horizon_days: int = 60) -> Optional[Dict[str, Any]]:
-    today = datetime.now().date()
+@lru_cache(maxsize=1024)
+def _pick_upcoming_birthday(profile_id: str, today: _date, horizon_days: int = 60) -> Optional[Mapping[str, Any]]:
+    # Stable for a given (profile, day); cleared by upsert_profile. The cached result is shared
+    # by every caller, so it is returned read-only
+    profile = PROFILES[profile_id]
     best: Optional[Dict[str, Any]] = None
     best_days = 10**9
-    meta = (profile or {}).get("meta", {})
-    # family
-    for f in meta.get("family", []) or []:
-        b = f.get("birthday")
-        if not b:
-            continue
-        dt = _parse_upcoming(b, today, horizon_days)
-        if not dt:
-            continue
-        days = (dt - today).days
-        if days < best_days:
-            best_days = days
-            best = {"name": f.get("name"), "relation": f.get("relation", "family"), "date": dt.isoformat(), "type": "birthday"}
-    # colleagues
-    for c in meta.get("colleagues", []) or []:
-        b = c.get("birthday")
-        if not b:
+    # family first, then colleagues (ties keep the earlier entry)
+    for c in profile.family + profile.colleagues:
+        if not c.bday_md:
             continue
-        dt = _parse_upcoming(b, today, horizon_days)
+        dt = _parse_upcoming(c.bday_md, c.bday_year, today, horizon_days)
         if not dt:
             continue
         days = (dt - today).days
         if days < best_days:
             best_days = days
-            best = {"name": c.get("name"), "relation": c.get("role", "colleague"), "date": dt.isoformat(), "type": "birthday"}
-    return best
+            best = {"name": c.name, "relation": c.relation, "date": dt.isoformat(), "type": "birthday"}
+    return MappingProxyType(best) if best is not None else None
+
+
+# Recent checkpointer misses (thread_id -> monotonic time), so polling an unknown
+# thread doesn't re-decode graph state on every call; bounded, oldest evicted first
+_NEG_PLAN_TTL_S = 2.0
+_NEG_PLAN_MAX = 10_000
+_NEGATIVE_PLAN_CACHE: "OrderedDict[str, float]" = OrderedDict()
+_NEG_PLAN_LOCK = threading.Lock()  # sync routes hit this from the threadpool
 
 
 def _get_persisted_plan(thread_id: str) -> Optional[Dict[str, Any]]:
     plan = PLAN_STORE.get(thread_id)
     if plan:
         return plan
+    with _NEG_PLAN_LOCK:
+        missed_at = _NEGATIVE_PLAN_CACHE.get(thread_id)
+    if missed_at is not None and time.monotonic() - missed_at < _NEG_PLAN_TTL_S:
+        return None
     # Fallback to graph checkpointer state if available
     try:
         config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": "birthday"}}
@@ -118,9 +182,15 @@ def _get_persisted_plan(thread_id: str) -> Optional[Dict[str, Any]]:
             plan = values.get("plan")
             if isinstance(plan, dict):
                 PLAN_STORE[thread_id] = plan
+                with _NEG_PLAN_LOCK:
+                    _NEGATIVE_PLAN_CACHE.pop(thread_id, None)
                 return plan
     except Exception:
         pass
+    with _NEG_PLAN_LOCK:
+        _NEGATIVE_PLAN_CACHE[thread_id] = time.monotonic(); _NEGATIVE_PLAN_CACHE.move_to_end(thread_id)
+        if len(_NEGATIVE_PLAN_CACHE) > _NEG_PLAN_MAX:
+            _NEGATIVE_PLAN_CACHE.popitem(last=False)
     return None
 
 
@@ -139,25 +209,94 @@ def _normalize_budget(val: Any) -> int:
     return 10000
 
 
+# Run one agent node on its own branch. Agent nodes only read profile/request and append
+# their own cards, so each branch gets a private outputs map over the shared base state.
+
+def _run_branch(func: Any, base: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # Copy-on-write view: reads fall through to the shared base, writes land in the branch-local map
+    local = ChainMap({"outputs": {"cards": []}, "logs": []}, base)
+    return func(local)["outputs"]["cards"]
+
+
+# Agent class name -> NODE_FUN key (shared by /api/agents/run and the NL agent flow)
+AGENT_TO_NODE = MappingProxyType({
+    "WorkLifeAgent": "work_life", "LifeAfterWorkAgent": "life_after_work", "RelaxationAgent": "relaxation",
+    "FitnessAgent": "fitness", "TrafficAgent": "traffic", "GettingStartedAgent": "getting_started", "HobbyAgent": "hobby",
+    "NutritionAgent": "nutrition", "FinanceErrandsAgent": "finance_errands", "LearningAgent": "learning", "CelebrationsAgent": "celebrations",
+})
+
+# Utterance keyword -> NODE_FUN key, in match priority order
+KEYWORD_TO_NODE: Tuple[Tuple[str, str], ...] = (
+    ("traffic", "traffic"), ("commute", "traffic"),
+    ("work", "work_life"), ("meeting", "work_life"),
+    ("fitness", "fitness"), ("gym", "fitness"),
+    ("relax", "relaxation"), ("unwind", "relaxation"),
+    ("hobby", "hobby"), ("learn", "learning"), ("study", "learning"),
+    ("nutrition", "nutrition"), ("diet", "nutrition"),
+    ("finance", "finance_errands"), ("errand", "finance_errands"),
+    ("evening", "life_after_work"), ("celebration", "celebrations"), ("party", "celebrations"),
+    ("start", "getting_started"), ("morning", "getting_started"),
+)
+_KEYWORD_RE = re.compile("|".join(re.escape(k) for k, _ in KEYWORD_TO_NODE))
+
+
+# NL birthday edits whose effect depends on re-running the birthday graph's stage gates
+REINVOKE_ACTIONS = frozenset({
+    "change_date", "confirm_theme_venue", "choose_time",
+    "add_invitees", "remove_invitees", "confirm_invitees", "confirm_send",
+})
+
+
+def get_profile(profile_id: str) -> Dict[str, Any]:
+    """Resolve a profile once at request entry; 404 if unknown."""
+    profile = DEMO_PROFILES.get(profile_id)
+    if not profile:
+        raise HTTPException(404, f"Unknown profile_id {profile_id}")
+    return profile
+
+
+# Request-scoped clock: resolved once per request and threaded through helpers
+
+def _req_now() -> datetime:
+    return datetime.now()
+
+
+def _new_thread_id(profile_id: str, kind: str, now: datetime) -> str:
+    # profile:kind:epoch-suffix; the random suffix keeps same-second starts (across workers too) apart
+    return f"{profile_id}:{kind}:{int(now.timestamp())}-{secrets.token_hex(4)}"
+
+
 # Collect completed home-ops results for this profile
 
 def _collect_home_ops_results(profile_id: str) -> List[Dict[str, Any]]:
-    results: Dict[str, Dict[str, Any]] = {}
-    prefix = f"{profile_id}:birthday:"
-    for tid, plan in PLAN_STORE.items():
-        if not tid.startswith(prefix):
-            continue
-        ops = (plan or {}).get("ops", {}) or {}
-        for kind, res in ops.items():
-            # Keep latest by kind (simple overwrite is fine for demo)
-            results[kind] = {"kind": kind, "result": res}
+    # Latest plan wins per kind
+    results = {
+        kind: {"kind": kind, "result": res}
+        for _tid, ops in PLAN_STORE.field_for_profile(profile_id, "birthday", "ops")
+        for kind, res in (ops or {}).items()
+    }
     return list(results.values())
 
 
 @app.get("/health")
-def health_check():
+def health_check(now: datetime = Depends(_req_now)):
     """Health check endpoint for container orchestration"""
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return {"status": "healthy", "timestamp": now.isoformat()}
+
+
+def debug_stats():
+    """Cache hit/miss counters for introspection."""
+    ci = _pick_upcoming_birthday.cache_info()
+    return {
+        "places": places_cache_stats(),
+        "upcoming_birthday": {"hits": ci.hits, "misses": ci.misses, "size": ci.currsize},
+        **comms_cache_stats(),
+    }
+
+
+# Internal counters; only exposed when explicitly enabled
+if settings.DEBUG_ENDPOINTS:
+    app.get("/api/debug/stats")(debug_stats)
 
 
 @app.get("/api/profiles")
@@ -168,73 +307,71 @@ def list_profiles():
 @app.post("/api/profiles/upsert")
 def upsert_profile(req: UpsertProfileRequest):
     DEMO_PROFILES[req.profile_id] = req.profile_json
+    PROFILES[req.profile_id] = Profile.from_json(req.profile_id, req.profile_json)
+    _derive_spouse_name.cache_clear(); _pick_upcoming_birthday.cache_clear()
     return {"ok": True, "count": len(DEMO_PROFILES)}
 
 
 @app.post("/api/plan/day", response_model=PlanResponse)
-def plan_day(req: PlanRequest):
-    profile = DEMO_PROFILES.get(req.profile_id)
-    if not profile: raise HTTPException(404, f"Unknown profile_id {req.profile_id}")
-    date = req.date or datetime.now().date().isoformat()
+async def plan_day(req: PlanRequest, now: datetime = Depends(_req_now)):
+    profile = get_profile(req.profile_id)
+    date = req.date or now.date().isoformat()
 
     # Compute day context and route
     ctx = compute_day_context(profile, date)
     order = router_order(profile, ctx)
+    # Resolve node callables once for the chosen route
+    funcs = tuple(NODE_FUN[n] for n in order)
 
     # Include any completed home-ops results for surfacing as cards
-    home_ops_results = _collect_home_ops_results(req.profile_id)
-
-    init = {"messages": [], "profile": profile, "request": {"date": date, "context": ctx, "home_ops_results": home_ops_results}, "now": datetime.now().isoformat(), "outputs": {}, "logs": []}
-    # Checkpointer keys
-    config = {"configurable": {"thread_id": f"{req.profile_id}:{date}", "checkpoint_ns": "plan_day"}}
+    home_ops_results = await _store_io(_collect_home_ops_results, req.profile_id)
 
-    # Execute in-process in decided order (explicit execution for better streaming parity)
-    state = init
-    # Supervisor insights first
-    sup = supervisor_insights(profile, ctx, bullets_override=req.supervisor_insights_bullets)
-    state.setdefault("outputs", {}).setdefault("cards", []).append(sup.dict())
-    for node_name in order:
-        state = NODE_FUN[node_name](state)
+    base = {"messages": [], "profile": profile, "request": {"date": date, "context": ctx, "home_ops_results": home_ops_results}, "now": now.isoformat()}
 
-    cards = sorted(state.get("outputs", {}).get("cards", []), key=lambda c: c.get("priority", 5))
+    # Only the supervisor may call the LLM, so it alone is offloaded; the pure-Python agent
+    # nodes run inline (well under a millisecond in total) while it is in flight
+    sup_task = asyncio.create_task(_offload(supervisor_insights, profile, ctx, bullets_override=req.supervisor_insights_bullets))
+    try:
+        branch_cards = [_run_branch(f, base) for f in funcs]
+    except BaseException:
+        sup_task.cancel()
+        raise
+    sup = await sup_task
+    # Serialize the supervisor card once; the dict form is what every consumer reuses
+    all_cards = [sup.model_dump(mode="json")] + list(chain.from_iterable(branch_cards))
+
+    # Every card is an AgentCard dump, so "priority" is always present
+    cards = sorted(all_cards, key=itemgetter("priority"))
     rationale = f"Profile role={ctx.get('role')}, night_owl={ctx.get('night_owl')}, load={ctx.get('day_load')}; sequence={['SupervisorAgent'] + order}"
-    return PlanResponse(date=date, profile_id=req.profile_id, timezone=profile.get("timezone","Asia/Kolkata"), cards=[AgentCard(**c) for c in cards], rationale=rationale)
+    return PlanResponse.model_construct(date=date, profile_id=req.profile_id, timezone=profile.get("timezone","Asia/Kolkata"), cards=[AgentCard.model_construct(**c) for c in cards], rationale=rationale)
 
 
 @app.post("/api/agents/run")
-def run_agent(req: AgentRunRequest):
-    profile = DEMO_PROFILES.get(req.profile_id)
-    if not profile: raise HTTPException(404, f"Unknown profile_id {req.profile_id}")
-    # Simple direct map instead of above trick:
-    amap = {
-        "WorkLifeAgent": "work_life", "LifeAfterWorkAgent": "life_after_work", "RelaxationAgent": "relaxation",
-        "FitnessAgent": "fitness", "TrafficAgent": "traffic", "GettingStartedAgent": "getting_started", "HobbyAgent": "hobby",
-        # New agents
-        "NutritionAgent": "nutrition", "FinanceErrandsAgent": "finance_errands", "LearningAgent": "learning", "CelebrationsAgent": "celebrations",
-    }
-    node_name = amap[req.agent]
+async def run_agent(req: AgentRunRequest):
+    profile = get_profile(req.profile_id)
+    node_name = AGENT_TO_NODE[req.agent]
     node = NODE_FUN[node_name]
     st = {"profile": profile, "request": req.context, "outputs": {"cards": []}}
-    out = node(st)
+    # Agent nodes are sync (and may call the LLM); keep them off the event loop
+    out = await _offload(node, st)
     return {"cards": out["outputs"]["cards"], "logs": [f"ran {node_name}"]}
 
 
-@app.post("/api/task/birthday")
-def birthday_task(req: BirthdayPlanRequest):
-    profile = DEMO_PROFILES.get(req.profile_id)
-    if not profile: raise HTTPException(404, f"Unknown profile_id {req.profile_id}")
+@app.post("/api/task/birthday", response_model=BirthdayPlanResponse)
+async def birthday_task(req: BirthdayPlanRequest, now: datetime = Depends(_req_now)):
+    profile = get_profile(req.profile_id)
     # Sensible defaults
     spouse = req.spouse_name or ""
     if spouse in {"Spouse", "Wife", "Husband", "Partner", ""}:
-        spouse = _derive_spouse_name(profile) or spouse or "Spouse"
-    params = req.dict(); params["spouse_name"] = spouse
+        spouse = _derive_spouse_name(req.profile_id) or spouse or "Spouse"
+    params = req.model_dump(); params["spouse_name"] = spouse
 
     # Normalize budget tiers/strings to numeric
     params["budget"] = _normalize_budget(params.get("budget"))
 
     # If no explicit event_date, try to pick the nearest upcoming birthday from profile context
     if not params.get("event_date"):
-        cand = _pick_upcoming_birthday(profile)
+        cand = _pick_upcoming_birthday(req.profile_id, now.date())
         if cand:
             params["spouse_name"] = cand.get("name") or params.get("spouse_name")
             params["event_date"] = cand.get("date")
@@ -243,24 +380,115 @@ def birthday_task(req: BirthdayPlanRequest):
 
     state = {"messages": [], "profile": profile, "params": params, "plan": {}}
     # Provide required configurable keys for checkpointer
-    thread_id = f"{req.profile_id}:birthday:{int(datetime.now().timestamp())}"
+    thread_id = _new_thread_id(req.profile_id, "birthday", now)
     config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": "birthday"}}
-    result = BIRTHDAY_GRAPH.invoke(state, config=config)
+    result = await _offload(BIRTHDAY_GRAPH.invoke, state, config=config)
     plan = result.get("plan", {})
-    PLAN_STORE[thread_id] = plan
-    return {"plan": plan, "thread_id": thread_id}
+    await _store_io(PLAN_STORE.__setitem__, thread_id, plan)
+    # Plans come from our own graph/store: skip re-validating them on the way out
+    return BirthdayPlanResponse.model_construct(thread_id=thread_id, plan=_plan_view(plan))
+
+
+# Fallbacks for plan fields missing when rendering invites (unfilled fields stay as placeholders)
+_PLAN_DEFAULTS = MappingProxyType({"spouse_name": "Spouse", "date": "{date}", "venue": "{venue}", "rsvp": "https://example.com/rsvp"})
+
+
+def _invite_render_vars(plan: Dict[str, Any]) -> Dict[str, str]:
+    # Placeholder values shared by the invite preview handlers (rewrite constraints + render params)
+    v = ChainMap(plan, _PLAN_DEFAULTS)
+    return {"spouse": v["spouse_name"], "date": v["date"], "venue": v["venue"], "rsvp": _PLAN_DEFAULTS["rsvp"]}
+
+
+# Apply one NL/batch birthday edit to `plan` in place; returns a short summary ("" for no-op).
+# `fallback` is a client-supplied plan consulted for spouse/invitees when `plan` lacks them.
+
+async def _apply_birthday_action(plan: Dict[str, Any], action: Dict[str, Any], fallback: Optional[Dict[str, Any]] = None) -> str:
+    summary = ""
+    t = action.get("type")
+    if t == "change_theme" and action.get("theme"):
+        plan["theme"] = action["theme"]; plan["stage"] = "review_theme_venue"; summary = "Changed theme."
+    elif t == "change_venue" and action.get("venue"):
+        plan["venue"] = action["venue"]; plan["stage"] = "review_theme_venue"; summary = "Changed venue."
+    elif t == "confirm_theme_venue":
+        plan["stage"] = "theme_venue_confirmed"; summary = "Confirmed theme and venue."
+    elif t == "choose_time" and action.get("time"):
+        plan["time"] = action["time"]; summary = f"Selected time {plan['time']}."
+    elif t == "change_date" and action.get("event_date"):
+        plan["date"] = action["event_date"]; plan.pop("availability", None); plan.pop("time_options", None); plan.pop("time", None)
+        summary = "Changed date."
+    elif t == "adjust_budget" and action.get("budget"):
+        plan["budget"] = _normalize_budget(action["budget"]); summary = "Adjusted budget."
+    elif t == "add_invitees":
+        emails = action.get("emails", [])
+        if emails:
+            plan["invitees"] = list(dict.fromkeys(plan.get("invitees", []) + list(emails)))
+            summary = f"Added {len(emails)} invitees."
+    elif t == "remove_invitees":
+        emails = set(action.get("emails", []))
+        if emails and plan.get("invitees"):
+            plan["invitees"] = [e for e in plan["invitees"] if e not in emails]
+            summary = f"Removed {len(emails)} invitees."
+    elif t == "confirm_invitees":
+        plan["stage"] = "invitees_confirmed"; summary = "Confirmed invitees."
+    elif t == "edit_invite_tone":
+        style = action.get("style", "friendly"); brev = action.get("brevity", "medium")
+        current = plan.get("invite_message_template") or "Hi {name},\nYou're invited to {spouse}'s surprise on {date} at {venue}. RSVP: {rsvp}"
+        constraints = {
+            "spouse": plan.get("spouse_name") or (fallback or {}).get("spouse_name") or "{spouse}",
+            "date": plan.get("date") or "{date}",
+            "venue": plan.get("venue") or "{venue}",
+        }
+        revised = await _offload(rewrite_invite_template, style, brev, current, constraints)
+        plan["invite_message_template"] = revised
+        invitees = plan.get("invitees", (fallback or {}).get("invitees", []))
+        preview = render_invite_preview(revised, invitees, {"spouse": constraints.get("spouse"), "date": constraints.get("date"), "venue": constraints.get("venue"), "rsvp": _PLAN_DEFAULTS["rsvp"]})
+        plan["invite_preview"] = preview
+        summary = f"Updated invite tone to {style}/{brev}."
+    elif t == "edit_invite_text":
+        tmpl = action.get("template")
+        if tmpl:
+            plan["invite_message_template"] = tmpl
+            invitees = plan.get("invitees", (fallback or {}).get("invitees", []))
+            preview = render_invite_preview(tmpl, invitees, _invite_render_vars(plan))
+            plan["invite_preview"] = preview
+            summary = "Rewrote invite template."
+    elif t == "confirm_send":
+        plan["stage"] = "ready_to_send"; summary = "Ready to send invites."
+    return summary
+
 
 # ---------------- Natural Language endpoint ----------------
 
 
 @app.post("/api/nl", response_model=NaturalCommandResponse)
-def nl_command(req: NaturalCommandRequest):
-    profile = DEMO_PROFILES.get(req.profile_id)
-    if not profile: raise HTTPException(404, f"Unknown profile_id {req.profile_id}")
+async def nl_command(req: NaturalCommandRequest, now: datetime = Depends(_req_now)):
+    profile = get_profile(req.profile_id)
+    action = req.client_action or await _offload(interpret_nl, req.utterance) or {}
+    return await _nl_execute(req, profile, action, now)
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
 
-    action = req.client_action or interpret_nl(req.utterance) or {}
+
+@app.post("/api/nl/stream")
+async def nl_command_stream(req: NaturalCommandRequest, now: datetime = Depends(_req_now)):
+    """SSE variant of /api/nl: emits the interpreted intent first, then the full result."""
+    profile = get_profile(req.profile_id)
+
+    async def events():
+        action = req.client_action or await _offload(interpret_nl, req.utterance) or {}
+        yield _sse("intent", action)
+        resp = await _nl_execute(req, profile, action, now)
+        yield _sse("result", resp.model_dump(mode="json"))
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+async def _nl_execute(req: NaturalCommandRequest, profile: Dict[str, Any], action: Dict[str, Any], now: datetime) -> NaturalCommandResponse:
+    # Route an interpreted NL action to the birthday flow or a single agent
     target = req.target
-    thread_id = req.thread_id or f"{req.profile_id}:nl:{int(datetime.now().timestamp())}"
+    thread_id = req.thread_id or _new_thread_id(req.profile_id, "nl", now)
 
     # If target auto and intent is birthday-related, route accordingly
     if target == "auto":
@@ -272,15 +500,15 @@ def nl_command(req: NaturalCommandRequest):
     # Birthday flow
     if target == "birthday":
         # Load existing plan from request, store, or checkpointer
-        plan: Dict[str, Any] = req.plan or _get_persisted_plan(thread_id) or {}
+        plan: Dict[str, Any] = req.plan or (await _store_io(_get_persisted_plan, thread_id)) or {}
         summary = ""
 
         # If starting or no plan exists, run graph to initialize
         if action.get("type") == "start_birthday_plan" or not plan:
-            cand = _pick_upcoming_birthday(profile)
+            cand = _pick_upcoming_birthday(req.profile_id, now.date())
             params = {
                 "profile_id": req.profile_id,
-                "spouse_name": action.get("spouse_name") or (cand.get("name") if cand else None) or _derive_spouse_name(profile) or "Spouse",
+                "spouse_name": action.get("spouse_name") or (cand.get("name") if cand else None) or _derive_spouse_name(req.profile_id) or "Spouse",
                 "event_date": action.get("event_date") or (cand.get("date") if cand else None),
                 "budget": _normalize_budget(action.get("budget", 10000)),
                 "invitees": action.get("invitees", []),
@@ -290,120 +518,54 @@ def nl_command(req: NaturalCommandRequest):
                 params["event_type"] = cand.get("type", "birthday")
             state = {"messages": [], "profile": profile, "params": params, "plan": plan}
             config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": "birthday"}}
-            result = BIRTHDAY_GRAPH.invoke(state, config=config)
+            result = await _offload(BIRTHDAY_GRAPH.invoke, state, config=config)
             plan = result.get("plan", {})
             summary = "Started birthday plan."
 
         # Apply edits / confirmations
         t = action.get("type")
-        if t == "change_theme" and action.get("theme"):
-            plan["theme"] = action["theme"]; plan["stage"] = "review_theme_venue"; summary = "Changed theme."
-        elif t == "change_venue" and action.get("venue"):
-            plan["venue"] = action["venue"]; plan["stage"] = "review_theme_venue"; summary = "Changed venue."
-        elif t == "confirm_theme_venue":
-            plan["stage"] = "theme_venue_confirmed"; summary = "Confirmed theme and venue."
-        elif t == "choose_time" and action.get("time"):
-            plan["time"] = action["time"]; summary = f"Selected time {plan['time']}."
-        elif t == "change_date" and action.get("event_date"):
-            plan["date"] = action["event_date"]; plan.pop("availability", None); plan.pop("time_options", None); plan.pop("time", None)
-            summary = "Changed date."
-        elif t == "adjust_budget" and action.get("budget"):
-            plan["budget"] = _normalize_budget(action["budget"]); summary = "Adjusted budget."
-        elif t == "add_invitees":
-            emails = action.get("emails", [])
-            if emails:
-                plan.setdefault("invitees", [])
-                for e in emails:
-                    if e not in plan["invitees"]: plan["invitees"].append(e)
-                summary = f"Added {len(emails)} invitees."
-        elif t == "remove_invitees":
-            emails = set(action.get("emails", []))
-            if emails and plan.get("invitees"):
-                plan["invitees"] = [e for e in plan["invitees"] if e not in emails]
-                summary = f"Removed {len(emails)} invitees."
-        elif t == "confirm_invitees":
-            plan["stage"] = "invitees_confirmed"; summary = "Confirmed invitees."
-        elif t == "edit_invite_tone":
-            style = action.get("style", "friendly"); brev = action.get("brevity", "medium")
-            current = plan.get("invite_message_template") or "Hi {name},\nYou're invited to {spouse}'s surprise on {date} at {venue}. RSVP: {rsvp}"
-            constraints = {
-                "spouse": plan.get("spouse_name") or (req.plan or {}).get("spouse_name") or "{spouse}",
-                "date": plan.get("date") or "{date}",
-                "venue": plan.get("venue") or "{venue}",
-            }
-            revised = rewrite_invite_template(style, brev, current, constraints)
-            plan["invite_message_template"] = revised
-            invitees = plan.get("invitees", (req.plan or {}).get("invitees", []))
-            preview = render_invite_preview(revised, invitees, {"spouse": constraints.get("spouse"), "date": constraints.get("date"), "venue": constraints.get("venue"), "rsvp": "https://example.com/rsvp"})
-            plan["invite_preview"] = preview
-            summary = f"Updated invite tone to {style}/{brev}."
-        elif t == "edit_invite_text":
-            tmpl = action.get("template")
-            if tmpl:
-                plan["invite_message_template"] = tmpl
-                invitees = plan.get("invitees", (req.plan or {}).get("invitees", []))
-                preview = render_invite_preview(tmpl, invitees, {"spouse": plan.get("spouse_name","Spouse"), "date": plan.get("date","{date}"), "venue": plan.get("venue","{venue}"), "rsvp": "https://example.com/rsvp"})
-                plan["invite_preview"] = preview
-                summary = "Rewrote invite template."
-        elif t == "confirm_send":
-            plan["stage"] = "ready_to_send"; summary = "Ready to send invites."
-
-        # Re-invoke the graph after edits to advance stages or recompute options
-        state = {"messages": [], "profile": profile, "params": {"invitees": plan.get("invitees", [])}, "plan": plan}
-        config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": "birthday"}}
-        result = BIRTHDAY_GRAPH.invoke(state, config=config)
-        plan = result.get("plan", plan)
+        summary = await _apply_birthday_action(plan, action, req.plan) or summary
+
+        # Re-invoke the graph only for edits that feed its stage gates; a fresh start, no-op
+        # edits and local field edits (theme/venue/budget/invite text) are already up to date
+        if t in REINVOKE_ACTIONS:
+            state = {"messages": [], "profile": profile, "params": {"invitees": plan.get("invitees", [])}, "plan": plan}
+            config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": "birthday"}}
+            result = await _offload(BIRTHDAY_GRAPH.invoke, state, config=config)
+            plan = result.get("plan", plan)
 
         # Persist plan in memory store
-        PLAN_STORE[thread_id] = plan
-        return NaturalCommandResponse(ok=True, summary=summary or "No changes.", plan=plan, thread_id=thread_id)
+        await _store_io(PLAN_STORE.__setitem__, thread_id, plan)
+        return NaturalCommandResponse.model_construct(ok=True, summary=summary or "No changes.", plan=_plan_view(plan), thread_id=thread_id)
 
     # Agent flow: map utterance or hint to an agent and run it once
-    amap_kw = {
-        "traffic": "traffic", "commute": "traffic",
-        "work": "work_life", "meeting": "work_life",
-        "fitness": "fitness", "gym": "fitness",
-        "relax": "relaxation", "unwind": "relaxation",
-        "hobby": "hobby", "learn": "learning", "study": "learning",
-        "nutrition": "nutrition", "diet": "nutrition",
-        "finance": "finance_errands", "errand": "finance_errands",
-        "evening": "life_after_work", "celebration": "celebrations", "party": "celebrations",
-        "start": "getting_started", "morning": "getting_started",
-    }
     node_name = None
     if req.agent:
         # If caller specifies, try exact map to NODE_FUN keys
-        reverse = {
-            "WorkLifeAgent": "work_life", "LifeAfterWorkAgent": "life_after_work", "RelaxationAgent": "relaxation",
-            "FitnessAgent": "fitness", "TrafficAgent": "traffic", "GettingStartedAgent": "getting_started", "HobbyAgent": "hobby",
-            "NutritionAgent": "nutrition", "FinanceErrandsAgent": "finance_errands", "LearningAgent": "learning", "CelebrationsAgent": "celebrations",
-        }
-        node_name = reverse.get(req.agent)
+        node_name = AGENT_TO_NODE.get(req.agent)
     if node_name is None:
-        low = req.utterance.lower()
-        for k, v in amap_kw.items():
-            if k in low:
-                node_name = v; break
+        # One regex pass over the utterance; table order decides between multiple hits
+        hits = set(_KEYWORD_RE.findall(req.utterance.lower()))
+        node_name = next((v for k, v in KEYWORD_TO_NODE if k in hits), None)
     if node_name is None:
-        return NaturalCommandResponse(ok=True, summary="No matching agent.", cards=None, thread_id=thread_id)
+        return NaturalCommandResponse.model_construct(ok=True, summary="No matching agent.", cards=None, thread_id=thread_id)
 
     node = NODE_FUN[node_name]
     st = {"profile": profile, "request": {}, "outputs": {"cards": []}}
-    out = node(st)
-    cards = [AgentCard(**c) for c in out.get("outputs", {}).get("cards", [])]
-    return NaturalCommandResponse(ok=True, summary=f"Ran {node_name}.", cards=cards, thread_id=thread_id)
+    out = await _offload(node, st)
+    cards = [AgentCard.model_construct(**c) for c in out.get("outputs", {}).get("cards", [])]
+    return NaturalCommandResponse.model_construct(ok=True, summary=f"Ran {node_name}.", cards=cards, thread_id=thread_id)
 
 # ---------------- Persistence helpers ----------------
 
 
-@app.get("/api/nl/plan")
+@app.get("/api/nl/plan", response_model=NaturalPlanResponse)
 def get_nl_plan(profile_id: str, thread_id: str):
-    if profile_id not in DEMO_PROFILES:
-        raise HTTPException(404, f"Unknown profile_id {profile_id}")
+    get_profile(profile_id)
     plan = _get_persisted_plan(thread_id)
     if not plan:
         raise HTTPException(404, f"No plan found for thread_id {thread_id}")
-    return {"ok": True, "plan": plan, "thread_id": thread_id}
+    return NaturalPlanResponse.model_construct(ok=True, plan=_plan_view(plan), thread_id=thread_id)
 
 
 @app.post("/api/nl/plan/save")
@@ -417,11 +579,11 @@ def save_nl_plan(payload: Dict[str, Any]):
 
 # ---------------- Timeline simulation endpoints ----------------
 
-from app.schemas import SimTickRequest, SimTickResponse, SimStatusResponse, TimelineTask
+from app.schemas import SimTickRequest, SimTickResponse, SimStatusResponse
 
 
-def _run_task(kind: str, plan: Dict[str, Any]) -> Dict[str, Any]:
-    """Simulate task execution; in real world, call sub-agents/tools."""
+def _run_task(kind: str, plan: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Simulate task execution at `now` (the tick's clock); in real world, call sub-agents/tools."""
     if kind == "decide_menu":
         guests = len(plan.get("invitees", [])) or 8
         veg = max(2, guests // 3)
@@ -436,66 +598,137 @@ def _run_task(kind: str, plan: Dict[str, Any]) -> Dict[str, Any]:
         ssid = f"Guest-{plan.get('spouse_name','Party')}"
         return {"ssid": ssid, "password": "party@123", "qr": "data:image/png;base64,...."}
     if kind == "secure_locks":
-        return {"locks_engaged": True, "time": datetime.now().isoformat()}
+        return {"locks_engaged": True, "time": now.isoformat()}
     if kind == "post_cleanup":
         return {"robot_started": True, "rooms": ["Living Room", "Dining", "Kitchen"], "duration_min": 60}
     return {"ok": True}
 
 
+def _timeline_task(task: Dict[str, Any], plan: Dict[str, Any]) -> Dict[str, Any]:
+    # Hydrate result from plan.ops for tasks that store a result_ref pointer; returns a dict so
+    # the response model validates the whole task list in one pass
+    ref = task.get("result_ref")
+    if ref is None or "result" in task:
+        return task
+    return {**task, "result": (plan.get("ops") or {}).get(ref)}
+
+
+def _plan_view(plan: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Plan as returned to clients: timeline results filled in from plan.ops; the stored plan is not modified."""
+    tasks = plan.get("ops_timeline") if plan else None
+    if not tasks or not any("result_ref" in t and "result" not in t for t in tasks):
+        return plan
+    return {**plan, "ops_timeline": [_timeline_task(t, plan) for t in tasks]}
+
+
+def _scheduled_epoch(task: Dict[str, Any], default: float) -> float:
+    # Pre-parsed at scheduling time; older/client-saved timelines fall back to parsing scheduledAt
+    ts = task.get("scheduled_epoch")
+    if ts is not None:
+        return ts
+    try:
+        return datetime.fromisoformat(task.get("scheduledAt")).timestamp()
+    except Exception:
+        return default
+
+
 @app.get("/api/timeline/status", response_model=SimStatusResponse)
-def get_timeline_status(thread_id: str):
+def get_timeline_status(thread_id: str, since: Optional[int] = None, now: datetime = Depends(_req_now)):
+    # Idle pollers: unchanged plan -> 304 without touching the checkpointer or re-serializing
+    version = PLAN_STORE.version(thread_id)
+    if since is not None and version and since == version:
+        return Response(status_code=304)
     plan = _get_persisted_plan(thread_id)
     if not plan:
         raise HTTPException(404, f"No plan for thread_id {thread_id}")
     tasks = plan.get("ops_timeline", [])
-    return SimStatusResponse(ok=True, thread_id=thread_id, now=datetime.now().isoformat(), tasks=[TimelineTask(**t) for t in tasks])
+    return SimStatusResponse(ok=True, thread_id=thread_id, now=now.isoformat(), tasks=[_timeline_task(t, plan) for t in tasks], version=PLAN_STORE.version(thread_id))
 
 
 @app.post("/api/timeline/tick", response_model=SimTickResponse)
-def tick_timeline(req: SimTickRequest):
-    plan = _get_persisted_plan(req.thread_id)
+async def tick_timeline(req: SimTickRequest, now: datetime = Depends(_req_now)):
+    plan = await _store_io(_get_persisted_plan, req.thread_id)
     if not plan:
         raise HTTPException(404, f"No plan for thread_id {req.thread_id}")
     tasks: List[Dict[str, Any]] = plan.get("ops_timeline", []) or []
-    now = datetime.fromisoformat(req.now) if req.now else datetime.now()
+    now = datetime.fromisoformat(req.now) if req.now else now
+
+    now_ts = now.timestamp()
+
+    # Server-scheduled timelines carry scheduled_epoch and are in schedule order; client-saved
+    # or older ones may not be, so those are scanned in full
+    in_order = all("scheduled_epoch" in t for t in tasks)
 
-    processed: List[TimelineTask] = []
+    processed: List[Dict[str, Any]] = []
     steps = 0
     for t in tasks:
         if steps >= req.maxSteps:
             break
         if t.get("status") != "scheduled":
             continue
-        try:
-            sched = datetime.fromisoformat(t.get("scheduledAt"))
-        except Exception:
-            sched = now
-        if sched <= now:
-            t["status"] = "running"
-            result = _run_task(t.get("kind"), plan)
-            # accumulate in plan.ops
-            plan.setdefault("ops", {})
-            plan["ops"][t.get("kind")] = result
-            t["result"] = result
-            t["status"] = "done"
-            processed.append(TimelineTask(**t))
-            steps += 1
+        sched_ts = _scheduled_epoch(t, now_ts)
+        if sched_ts > now_ts:
+            if in_order:
+                break  # nothing later is due either
+            continue
+        t["status"] = "running"
+        result = _run_task(t.get("kind"), plan, now)
+        # Result lives once in plan.ops; the task keeps a pointer to it
+        ops = plan.setdefault("ops", {})
+        ops[t.get("kind")] = result
+        t["result_ref"] = t.get("kind")
+        t["status"] = "done"
+        processed.append(_timeline_task(t, plan))
+        steps += 1
 
     # Persist updates
     plan["ops_timeline"] = tasks
-    PLAN_STORE[req.thread_id] = plan
+    await _store_io(PLAN_STORE.__setitem__, req.thread_id, plan)
 
     remaining = len([t for t in tasks if t.get("status") == "scheduled"])
     return SimTickResponse(ok=True, thread_id=req.thread_id, now=now.isoformat(), processed=processed, remaining=remaining)
 
 # ---------------- WebSocket: incremental card updates ----------------
+
+@app.websocket("/ws/plan/day")
+async def ws_plan_day(ws: WebSocket, now: datetime = Depends(_req_now)):
+    await ws.accept()
+    try:
+        try:
+            req = WsPlanDayRequest.model_validate_json(await ws.receive_text())
+        except ValidationError as e:
+            await ws.send_json({"type": "error", "error": str(e)}); await ws.close(); return
+        profile = DEMO_PROFILES.get(req.profile_id)
+        if not profile:
+            await ws.send_json({"type": "error", "error": f"Unknown profile_id {req.profile_id}"}); await ws.close(); return
+        date = req.date or now.date().isoformat()
+        ctx = compute_day_context(profile, date)
+        order = router_order(profile, ctx)
+
+        # Supervisor (the only LLM caller) runs off the loop while the pure-Python agent nodes run inline
+        sup_task = asyncio.create_task(_offload(supervisor_insights, profile, ctx, bullets_override=req.supervisor_insights_bullets))
+        try:
+            base = {"messages": [], "profile": profile, "request": {"date": date, "context": ctx, "home_ops_results": await _store_io(_collect_home_ops_results, req.profile_id)}, "now": now.isoformat()}
+            branch_cards = [_run_branch(NODE_FUN[n], base) for n in order]
+        except BaseException:
+            sup_task.cancel()
+            raise
+        # Branch cards are ready by the time the supervisor returns, so everything goes out in one
+        # "cards" frame (supervisor first); a lone card keeps the single "card" frame
+        cards = [(await sup_task).model_dump(mode="json"), *chain.from_iterable(branch_cards)]
+        await ws.send_json({"type": "cards", "items": cards} if len(cards) > 1 else {"type": "card", "card": cards[0]})
+        await ws.send_json({"type": "done", "date": date, "profile_id": req.profile_id, "sequence": ["SupervisorAgent"] + order})
+        await ws.close()
+    except WebSocketDisconnect:
+        pass
+
 from app.schemas import (
-    BirthdayStartRequest, BirthdayPlanResponse, ThemeUpdateRequest, VenueUpdateRequest,
+    BirthdayStartRequest, ThemeUpdateRequest, VenueUpdateRequest,
     DateUpdateRequest, TimeUpdateRequest, BudgetUpdateRequest,
-    InviteesPutRequest, InviteesEmailsRequest, InvitesToneRequest, InvitesTextRequest,
+    InviteesPutRequest, InviteesEmailsRequest, InvitesToneRequest, InvitesTextRequest, BirthdayBatchRequest,
     OrchestrateRequest, OrchestrateResponse,
 )
-from app.recommendations.places_gateway import search_places
+from app.recommendations.places_gateway import search_places, cache_stats as places_cache_stats
 
 # -------------- Helpers for organized endpoints --------------
 
@@ -508,143 +741,148 @@ def _ensure_plan(thread_id: str, profile_id: str) -> Dict[str, Any]:
     return plan
 
 
-def _advance_graph(thread_id: str, profile: Dict[str, Any], plan: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+async def _advance_graph(thread_id: str, profile: Dict[str, Any], plan: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
     state = {"messages": [], "profile": profile, "params": params, "plan": plan}
     config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": "birthday"}}
-    result = BIRTHDAY_GRAPH.invoke(state, config=config)
+    result = await _offload(BIRTHDAY_GRAPH.invoke, state, config=config)
     plan = result.get("plan", plan)
-    PLAN_STORE[thread_id] = plan
+    await _store_io(PLAN_STORE.__setitem__, thread_id, plan)
     return plan
 
 
+async def _update_and_advance(thread_id: str, profile_id: str, profile: Dict[str, Any], updates: Dict[str, Any], plan: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    # Field edit + graph advance with an already-resolved profile; callers holding the
+    # current plan (orchestration) pass it in to skip the store read
+    if plan is None:
+        plan = await _store_io(_ensure_plan, thread_id, profile_id)
+    else:
+        plan.setdefault("profile_id", profile_id)
+    plan.update(updates)
+    return await _advance_graph(thread_id, profile, plan, {})
+
+
 # -------------- Organized REST: Birthday endpoints --------------
 
 @app.post("/api/birthdays", response_model=BirthdayPlanResponse)
-def birthday_start(req: BirthdayStartRequest):
-    profile = DEMO_PROFILES.get(req.profile_id)
-    if not profile:
-        raise HTTPException(404, f"Unknown profile_id {req.profile_id}")
+async def birthday_start(req: BirthdayStartRequest, now: datetime = Depends(_req_now)):
+    profile = get_profile(req.profile_id)
     # Reuse /api/task/birthday logic
-    spouse = req.spouse_name or _derive_spouse_name(profile) or "Spouse"
-    params = req.dict(); params["spouse_name"] = spouse
+    spouse = req.spouse_name or _derive_spouse_name(req.profile_id) or "Spouse"
+    params = req.model_dump(); params["spouse_name"] = spouse
     params["budget"] = _normalize_budget(params.get("budget"))
     state = {"messages": [], "profile": profile, "params": params, "plan": {}}
-    thread_id = f"{req.profile_id}:birthday:{int(datetime.now().timestamp())}"
+    thread_id = _new_thread_id(req.profile_id, "birthday", now)
     config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": "birthday"}}
-    result = BIRTHDAY_GRAPH.invoke(state, config=config)
+    result = await _offload(BIRTHDAY_GRAPH.invoke, state, config=config)
     plan = result.get("plan", {})
-    PLAN_STORE[thread_id] = plan
-    return BirthdayPlanResponse(thread_id=thread_id, plan=plan)
+    await _store_io(PLAN_STORE.__setitem__, thread_id, plan)
+    return BirthdayPlanResponse.model_construct(thread_id=thread_id, plan=_plan_view(plan))
 
 
 @app.get("/api/birthdays/{thread_id}", response_model=BirthdayPlanResponse)
-def birthday_get(thread_id: str, profile_id: str):
+def birthday_get(thread_id: str, profile_id: str, response: Response, if_none_match: Optional[str] = Header(None)):
+    # Plan write counter doubles as a weak ETag; plans are per-user, so clients must revalidate
+    version = PLAN_STORE.version(thread_id)
+    etag = f'W/"{version}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if version and if_none_match == etag:
+        return Response(status_code=304, headers=headers)
     plan = _ensure_plan(thread_id, profile_id)
-    return BirthdayPlanResponse(thread_id=thread_id, plan=plan)
+    if version:
+        response.headers.update(headers)
+    return BirthdayPlanResponse.model_construct(thread_id=thread_id, plan=_plan_view(plan))
 
 
 @app.patch("/api/birthdays/{thread_id}/theme", response_model=BirthdayPlanResponse)
-def birthday_update_theme(thread_id: str, profile_id: str, req: ThemeUpdateRequest):
-    profile = DEMO_PROFILES.get(profile_id) or {}
-    plan = _ensure_plan(thread_id, profile_id)
-    plan["theme"] = req.theme; plan["stage"] = "review_theme_venue"
-    plan = _advance_graph(thread_id, profile, plan, {})
-    return BirthdayPlanResponse(thread_id=thread_id, plan=plan)
+async def birthday_update_theme(thread_id: str, profile_id: str, req: ThemeUpdateRequest):
+    plan = await _update_and_advance(thread_id, profile_id, DEMO_PROFILES.get(profile_id) or {}, {"theme": req.theme, "stage": "review_theme_venue"})
+    return BirthdayPlanResponse.model_construct(thread_id=thread_id, plan=_plan_view(plan))
 
 
 @app.patch("/api/birthdays/{thread_id}/venue", response_model=BirthdayPlanResponse)
-def birthday_update_venue(thread_id: str, profile_id: str, req: VenueUpdateRequest):
-    profile = DEMO_PROFILES.get(profile_id) or {}
-    plan = _ensure_plan(thread_id, profile_id)
-    plan["venue"] = req.venue; plan["stage"] = "review_theme_venue"
-    plan = _advance_graph(thread_id, profile, plan, {})
-    return BirthdayPlanResponse(thread_id=thread_id, plan=plan)
+async def birthday_update_venue(thread_id: str, profile_id: str, req: VenueUpdateRequest):
+    plan = await _update_and_advance(thread_id, profile_id, DEMO_PROFILES.get(profile_id) or {}, {"venue": req.venue, "stage": "review_theme_venue"})
+    return BirthdayPlanResponse.model_construct(thread_id=thread_id, plan=_plan_view(plan))
 
 
 @app.patch("/api/birthdays/{thread_id}/date", response_model=BirthdayPlanResponse)
-def birthday_update_date(thread_id: str, profile_id: str, req: DateUpdateRequest):
+async def birthday_update_date(thread_id: str, profile_id: str, req: DateUpdateRequest):
     profile = DEMO_PROFILES.get(profile_id) or {}
-    plan = _ensure_plan(thread_id, profile_id)
+    plan = await _store_io(_ensure_plan, thread_id, profile_id)
     plan["date"] = req.event_date
     # reset scheduling bits
     for k in ["availability","time_options","time"]:
         plan.pop(k, None)
-    plan = _advance_graph(thread_id, profile, plan, {})
-    return BirthdayPlanResponse(thread_id=thread_id, plan=plan)
+    plan = await _advance_graph(thread_id, profile, plan, {})
+    return BirthdayPlanResponse.model_construct(thread_id=thread_id, plan=_plan_view(plan))
 
 
 @app.patch("/api/birthdays/{thread_id}/time", response_model=BirthdayPlanResponse)
-def birthday_update_time(thread_id: str, profile_id: str, req: TimeUpdateRequest):
-    profile = DEMO_PROFILES.get(profile_id) or {}
-    plan = _ensure_plan(thread_id, profile_id)
-    plan["time"] = req.time
-    plan = _advance_graph(thread_id, profile, plan, {})
-    return BirthdayPlanResponse(thread_id=thread_id, plan=plan)
+async def birthday_update_time(thread_id: str, profile_id: str, req: TimeUpdateRequest):
+    plan = await _update_and_advance(thread_id, profile_id, DEMO_PROFILES.get(profile_id) or {}, {"time": req.time})
+    return BirthdayPlanResponse.model_construct(thread_id=thread_id, plan=_plan_view(plan))
 
 
 @app.patch("/api/birthdays/{thread_id}/budget", response_model=BirthdayPlanResponse)
-def birthday_update_budget(thread_id: str, profile_id: str, req: BudgetUpdateRequest):
+async def birthday_update_budget(thread_id: str, profile_id: str, req: BudgetUpdateRequest):
     profile = DEMO_PROFILES.get(profile_id) or {}
-    plan = _ensure_plan(thread_id, profile_id)
+    plan = await _store_io(_ensure_plan, thread_id, profile_id)
     plan["budget"] = _normalize_budget(req.budget)
-    plan = _advance_graph(thread_id, profile, plan, {})
-    return BirthdayPlanResponse(thread_id=thread_id, plan=plan)
+    plan = await _advance_graph(thread_id, profile, plan, {})
+    return BirthdayPlanResponse.model_construct(thread_id=thread_id, plan=_plan_view(plan))
 
 
 @app.put("/api/birthdays/{thread_id}/invitees", response_model=BirthdayPlanResponse)
-def birthday_put_invitees(thread_id: str, profile_id: str, req: InviteesPutRequest):
+async def birthday_put_invitees(thread_id: str, profile_id: str, req: InviteesPutRequest):
     profile = DEMO_PROFILES.get(profile_id) or {}
-    plan = _ensure_plan(thread_id, profile_id)
+    plan = await _store_io(_ensure_plan, thread_id, profile_id)
     plan["invitees"] = list(dict.fromkeys(req.invitees))
-    plan = _advance_graph(thread_id, profile, plan, {"invitees": plan.get("invitees", [])})
-    return BirthdayPlanResponse(thread_id=thread_id, plan=plan)
+    plan = await _advance_graph(thread_id, profile, plan, {"invitees": plan.get("invitees", [])})
+    return BirthdayPlanResponse.model_construct(thread_id=thread_id, plan=_plan_view(plan))
 
 
 @app.post("/api/birthdays/{thread_id}/invitees/add", response_model=BirthdayPlanResponse)
-def birthday_add_invitees(thread_id: str, profile_id: str, req: InviteesEmailsRequest):
+async def birthday_add_invitees(thread_id: str, profile_id: str, req: InviteesEmailsRequest):
     profile = DEMO_PROFILES.get(profile_id) or {}
-    plan = _ensure_plan(thread_id, profile_id)
-    plan.setdefault("invitees", [])
-    for e in req.emails:
-        if e not in plan["invitees"]:
-            plan["invitees"].append(e)
-    plan = _advance_graph(thread_id, profile, plan, {"invitees": plan.get("invitees", [])})
-    return BirthdayPlanResponse(thread_id=thread_id, plan=plan)
+    plan = await _store_io(_ensure_plan, thread_id, profile_id)
+    plan["invitees"] = list(dict.fromkeys(plan.get("invitees", []) + req.emails))
+    plan = await _advance_graph(thread_id, profile, plan, {"invitees": plan.get("invitees", [])})
+    return BirthdayPlanResponse.model_construct(thread_id=thread_id, plan=_plan_view(plan))
 
 
 @app.post("/api/birthdays/{thread_id}/invitees/remove", response_model=BirthdayPlanResponse)
-def birthday_remove_invitees(thread_id: str, profile_id: str, req: InviteesEmailsRequest):
+async def birthday_remove_invitees(thread_id: str, profile_id: str, req: InviteesEmailsRequest):
     profile = DEMO_PROFILES.get(profile_id) or {}
-    plan = _ensure_plan(thread_id, profile_id)
+    plan = await _store_io(_ensure_plan, thread_id, profile_id)
     emails = set(req.emails)
     plan["invitees"] = [e for e in plan.get("invitees", []) if e not in emails]
-    plan = _advance_graph(thread_id, profile, plan, {"invitees": plan.get("invitees", [])})
-    return BirthdayPlanResponse(thread_id=thread_id, plan=plan)
+    plan = await _advance_graph(thread_id, profile, plan, {"invitees": plan.get("invitees", [])})
+    return BirthdayPlanResponse.model_construct(thread_id=thread_id, plan=_plan_view(plan))
 
 
 @app.post("/api/birthdays/{thread_id}/invitees/confirm", response_model=BirthdayPlanResponse)
-def birthday_confirm_invitees(thread_id: str, profile_id: str):
+async def birthday_confirm_invitees(thread_id: str, profile_id: str):
     profile = DEMO_PROFILES.get(profile_id) or {}
-    plan = _ensure_plan(thread_id, profile_id)
+    plan = await _store_io(_ensure_plan, thread_id, profile_id)
     plan["stage"] = "invitees_confirmed"
-    plan = _advance_graph(thread_id, profile, plan, {})
-    return BirthdayPlanResponse(thread_id=thread_id, plan=plan)
+    plan = await _advance_graph(thread_id, profile, plan, {})
+    return BirthdayPlanResponse.model_construct(thread_id=thread_id, plan=_plan_view(plan))
 
 
 @app.post("/api/birthdays/{thread_id}/invites/preview/tone", response_model=BirthdayPlanResponse)
-def birthday_invites_tone(thread_id: str, profile_id: str, req: InvitesToneRequest):
+async def birthday_invites_tone(thread_id: str, profile_id: str, req: InvitesToneRequest):
     # Reuse existing NL helper to rewrite text
-    plan = _ensure_plan(thread_id, profile_id)
+    plan = await _store_io(_ensure_plan, thread_id, profile_id)
     from app.tools.comms import rewrite_invite_template, render_invite_preview
     style, brev = req.style, req.brevity
     current = plan.get("invite_message_template") or "Hi {name},\nYou're invited to {spouse}'s surprise on {date} at {venue}. RSVP: {rsvp}"
-    constraints = {"spouse": plan.get("spouse_name","Spouse"), "date": plan.get("date","{date}"), "venue": plan.get("venue","{venue}")}
-    revised = rewrite_invite_template(style, brev, current, constraints)
+    render_vars = _invite_render_vars(plan)
+    revised = await _offload(rewrite_invite_template, style, brev, current, render_vars)
     plan["invite_message_template"] = revised
-    preview = render_invite_preview(revised, plan.get("invitees", []), {"spouse": constraints["spouse"], "date": constraints["date"], "venue": constraints["venue"], "rsvp": "https://example.com/rsvp"})
+    preview = render_invite_preview(revised, plan.get("invitees", []), render_vars)
     plan["invite_preview"] = preview
-    PLAN_STORE[thread_id] = plan
-    return BirthdayPlanResponse(thread_id=thread_id, plan=plan)
+    await _store_io(PLAN_STORE.update_fields, thread_id, plan, ("invite_message_template", "invite_preview"))
+    return BirthdayPlanResponse.model_construct(thread_id=thread_id, plan=_plan_view(plan))
 
 
 @app.post("/api/birthdays/{thread_id}/invites/preview/text", response_model=BirthdayPlanResponse)
@@ -652,97 +890,128 @@ def birthday_invites_text(thread_id: str, profile_id: str, req: InvitesTextReque
     from app.tools.comms import render_invite_preview
     plan = _ensure_plan(thread_id, profile_id)
     plan["invite_message_template"] = req.template
-    preview = render_invite_preview(req.template, plan.get("invitees", []), {"spouse": plan.get("spouse_name","Spouse"), "date": plan.get("date","{date}"), "venue": plan.get("venue","{venue}"), "rsvp": "https://example.com/rsvp"})
+    preview = render_invite_preview(req.template, plan.get("invitees", []), _invite_render_vars(plan))
     plan["invite_preview"] = preview
-    PLAN_STORE[thread_id] = plan
-    return BirthdayPlanResponse(thread_id=thread_id, plan=plan)
+    PLAN_STORE.update_fields(thread_id, plan, ("invite_message_template", "invite_preview"))
+    return BirthdayPlanResponse.model_construct(thread_id=thread_id, plan=_plan_view(plan))
+
+
+async def _mark_ready_to_send(thread_id: str, profile_id: str, profile: Optional[Dict[str, Any]] = None, updates: Optional[Dict[str, Any]] = None, plan: Optional[Dict[str, Any]] = None) -> BirthdayPlanResponse:
+    # Shared by invites/ready and invites/send: both authorize sending and advance the graph once
+    # (orchestration folds its pending field edits into the same advance via `updates`)
+    if profile is None:
+        profile = DEMO_PROFILES.get(profile_id) or {}
+    plan = await _update_and_advance(thread_id, profile_id, profile, {**(updates or {}), "stage": "ready_to_send"}, plan)
+    return BirthdayPlanResponse.model_construct(thread_id=thread_id, plan=_plan_view(plan))
 
 
 @app.post("/api/birthdays/{thread_id}/invites/ready", response_model=BirthdayPlanResponse)
-def birthday_invites_ready(thread_id: str, profile_id: str):
-    profile = DEMO_PROFILES.get(profile_id) or {}
-    plan = _ensure_plan(thread_id, profile_id)
-    plan["stage"] = "ready_to_send"
-    plan = _advance_graph(thread_id, profile, plan, {})
-    return BirthdayPlanResponse(thread_id=thread_id, plan=plan)
+async def birthday_invites_ready(thread_id: str, profile_id: str):
+    return await _mark_ready_to_send(thread_id, profile_id)
 
 
 @app.post("/api/birthdays/{thread_id}/invites/send", response_model=BirthdayPlanResponse)
-def birthday_invites_send(thread_id: str, profile_id: str):
+async def birthday_invites_send(thread_id: str, profile_id: str):
+    return await _mark_ready_to_send(thread_id, profile_id)
+
+
+@app.post("/api/birthdays/{thread_id}/batch", response_model=BirthdayPlanResponse)
+async def birthday_batch(thread_id: str, profile_id: str, req: BirthdayBatchRequest):
     profile = DEMO_PROFILES.get(profile_id) or {}
-    plan = _ensure_plan(thread_id, profile_id)
-    plan["stage"] = "ready_to_send"
-    plan = _advance_graph(thread_id, profile, plan, {})
-    return BirthdayPlanResponse(thread_id=thread_id, plan=plan)
+    plan = await _store_io(_ensure_plan, thread_id, profile_id)
+    # Apply every field edit first, then advance the graph and persist once
+    for action in req.actions:
+        await _apply_birthday_action(plan, action)
+    if any(a.get("type") in REINVOKE_ACTIONS for a in req.actions):
+        plan = await _advance_graph(thread_id, profile, plan, {"invitees": plan.get("invitees", [])})
+    else:
+        await _store_io(PLAN_STORE.__setitem__, thread_id, plan)
+    return BirthdayPlanResponse.model_construct(thread_id=thread_id, plan=_plan_view(plan))
 
 
 @app.get("/api/birthdays/{thread_id}/timeline", response_model=SimStatusResponse)
-def birthday_timeline(thread_id: str, profile_id: str):
+def birthday_timeline(thread_id: str, profile_id: str, since: Optional[int] = None, now: datetime = Depends(_req_now)):
+    version = PLAN_STORE.version(thread_id)
+    if since is not None and version and since == version:
+        return Response(status_code=304)
     plan = _ensure_plan(thread_id, profile_id)
     tasks = plan.get("ops_timeline", [])
-    return SimStatusResponse(ok=True, thread_id=thread_id, now=datetime.now().isoformat(), tasks=[TimelineTask(**t) for t in tasks])
+    return SimStatusResponse(ok=True, thread_id=thread_id, now=now.isoformat(), tasks=[_timeline_task(t, plan) for t in tasks], version=PLAN_STORE.version(thread_id))
 
 
 @app.post("/api/birthdays/{thread_id}/timeline/tick", response_model=SimTickResponse)
-def birthday_timeline_tick(thread_id: str, profile_id: str, req: SimTickRequest):
+async def birthday_timeline_tick(thread_id: str, profile_id: str, req: SimTickRequest, now: datetime = Depends(_req_now)):
     # Ensure we use the path thread_id, not the one in body
     req.thread_id = thread_id
-    return tick_timeline(req)
+    return await tick_timeline(req, now)
 
 
 # ---------------- Master Orchestrator ----------------
 
 @app.post("/api/orchestrate/party", response_model=OrchestrateResponse)
-def orchestrate_party(req: OrchestrateRequest):
-    profile = DEMO_PROFILES.get(req.profile_id)
-    if not profile:
-        raise HTTPException(404, f"Unknown profile_id {req.profile_id}")
+async def orchestrate_party(req: OrchestrateRequest, now: datetime = Depends(_req_now)):
+    profile = get_profile(req.profile_id)
+
+    # Venue search only needs the home location, so overlap it with plan start. Profiles that
+    # prefer home get "Home" as the graph's default venue, which is kept, so don't search for them
+    venue_task = None
+    venue_search = req.venueMode in ("restaurant", "auto")
+    loc = (profile.get("homeLocation") or {})
+    lat = (loc.get("lat") or 37.7749); lng = (loc.get("lng") or -122.4194)
+    places_params = {"lat": lat, "lng": lng, "radius": 3000, "query": "birthday dinner", "priceLevel": 3}
+    if venue_search and not (profile.get("meta") or {}).get("prefers_home"):
+        venue_task = asyncio.create_task(_offload(search_places, places_params))
 
     # 1) Start plan
-    spouse = req.honoree_name or _derive_spouse_name(profile) or "Spouse"
+    spouse = req.honoree_name or _derive_spouse_name(req.profile_id) or "Spouse"
     start = BirthdayStartRequest(profile_id=req.profile_id, spouse_name=spouse, event_date=req.event_date, budget=req.budget or 10000, invitees=req.invitees)
-    start_resp = birthday_start(start)
+    try:
+        start_resp = await birthday_start(start, now)
+    except BaseException:
+        if venue_task:
+            venue_task.cancel()
+        raise
     tid = start_resp.thread_id
     plan = start_resp.plan
 
+    # Field edits are collected and applied with a single graph advance at the end;
+    # intermediate advances would stop at the theme/venue gate without changing anything
+    updates: Dict[str, Any] = {}
+
     # 2) Venue research if auto/restaurant
     chosen_venue = plan.get("venue")
-    if req.venueMode in ("restaurant", "auto") and (not chosen_venue or chosen_venue.lower().startswith("home") is False):
-        # Try searching near profile home location (or default coords)
-        loc = (profile.get("homeLocation") or {})
-        lat = (loc.get("lat") or 37.7749); lng = (loc.get("lng") or -122.4194)
-        places = search_places({"lat": lat, "lng": lng, "radius": 3000, "query": "birthday dinner", "priceLevel": 3})
+    # A fresh plan only carries the graph's default venue; replace it unless that default is Home
+    if venue_search and (not chosen_venue or not chosen_venue.lower().startswith("home")):
+        places = await (venue_task or _offload(search_places, places_params))
         if places:
             chosen_venue = places[0]["name"]
-            birthday_update_venue(tid, req.profile_id, VenueUpdateRequest(venue=chosen_venue))
-            plan = _get_persisted_plan(tid) or plan
+            updates["venue"] = chosen_venue
+    elif venue_task:
+        venue_task.cancel()
 
     # 3) If home explicitly requested, ensure Home is set
     if req.venueMode == "home":
         chosen_venue = "Home - Living room"
-        birthday_update_venue(tid, req.profile_id, VenueUpdateRequest(venue=chosen_venue))
-        plan = _get_persisted_plan(tid) or plan
+        updates["venue"] = chosen_venue
 
     # 4) Pick a time (prefer 19:00 if available)
+    # time_options come from calendar_lookup's time-sorted events, so HH:MM strings are already in order
     time_opts = plan.get("time_options", [])
-    pick = next((t for t in time_opts if t >= "18:30"), time_opts[0] if time_opts else "19:00")
-    birthday_update_time(tid, req.profile_id, TimeUpdateRequest(time=pick))
-    plan = _get_persisted_plan(tid) or plan
-
-    # 5) Confirm theme/venue
-    birthday_update_theme(tid, req.profile_id, ThemeUpdateRequest(theme=plan.get("theme") or "Warm & Minimal"))
-    plan = _get_persisted_plan(tid) or plan
-    birthday_invites_ready(tid, req.profile_id)
-    plan = _get_persisted_plan(tid) or plan
-    birthday_invites_send(tid, req.profile_id)
-    plan = _get_persisted_plan(tid) or plan
+    idx = bisect_left(time_opts, "18:30")
+    pick = time_opts[idx] if idx < len(time_opts) else (time_opts[0] if time_opts else "19:00")
+    updates["time"] = pick
+
+    # 5) Confirm theme/venue and authorize sending in one advance
+    updates["theme"] = plan.get("theme") or "Warm & Minimal"
+    # The plan from birthday_start is still current (no writes since), so hand it over directly
+    plan = (await _mark_ready_to_send(tid, req.profile_id, profile, updates, plan)).plan
 
     # 6) Optionally accelerate timeline
     notes = None
     if req.accelerateTo:
         tick = SimTickRequest(thread_id=tid, now=req.accelerateTo, maxSteps=10)
-        tick_timeline(tick)
-        plan = _get_persisted_plan(tid) or plan
+        await tick_timeline(tick, now)
+        plan = (await _store_io(_get_persisted_plan, tid)) or plan
         notes = f"Advanced timeline to {req.accelerateTo}"
 
-    return OrchestrateResponse(ok=True, thread_id=tid, plan=plan, notes=notes)
+    return OrchestrateResponse.model_construct(ok=True, thread_id=tid, plan=_plan_view(plan), notes=notes)
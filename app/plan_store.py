@@ -0,0 +1,135 @@
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+from app.settings import settings
+from functools import lru_cache
+from app.jsoncodec import dumps as _dumps, loads as _loads
+import threading
+
+
+def _import_redis():
+    try:
+        import redis  # type: ignore
+        return redis
+    except Exception:
+        return None
+
+
+def _profile_of(thread_id: str) -> str:
+    return thread_id.split(":", 1)[0]
+
+
+_LOCK_STRIPES = 16  # power of two; writes to the same thread serialize, different threads rarely contend
+
+
+class MemoryPlanStore:
+    """Process-local plan store (default; not shared across workers)."""
+
+    def __init__(self) -> None:
+        self._plans: Dict[str, Dict[str, Any]] = {}
+        # profile_id -> thread_ids in insertion order (dict as ordered set)
+        self._by_profile: Dict[str, Dict[str, None]] = {}
+        self._versions: Dict[str, int] = {}
+        self._locks = tuple(threading.Lock() for _ in range(_LOCK_STRIPES))
+
+    def get(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        return self._plans.get(thread_id)
+
+    def version(self, thread_id: str) -> int:
+        """Write counter for a thread; 0 if never stored."""
+        return self._versions.get(thread_id, 0)
+
+    def __setitem__(self, thread_id: str, plan: Dict[str, Any]) -> None:
+        # Sync routes write from the threadpool; the version bump is a read-modify-write
+        with self._locks[hash(thread_id) & (_LOCK_STRIPES - 1)]:
+            self._plans[thread_id] = plan
+            self._versions[thread_id] = self._versions.get(thread_id, 0) + 1
+        self._by_profile.setdefault(_profile_of(thread_id), {})[thread_id] = None
+
+    def update_fields(self, thread_id: str, plan: Dict[str, Any], fields: Iterable[str]) -> None:
+        """Persist only `fields` of plan; the live dict is already stored, so this just bumps the version."""
+        self[thread_id] = plan
+
+    def field_for_profile(self, profile_id: str, kind: str, field: str) -> Iterator[Tuple[str, Any]]:
+        """(thread_id, plan[field]) for the profile's `kind` threads, oldest first; None where unset."""
+        prefix = f"{profile_id}:{kind}:"
+        for tid in list(self._by_profile.get(profile_id, ())):
+            if tid.startswith(prefix):
+                yield tid, (self._plans[tid] or {}).get(field)
+
+
+class RedisPlanStore:
+    """Redis-backed plan store: one hash per thread (a field per top-level plan key), shared across workers, expired by TTL."""
+
+    def __init__(self, client: Any, ttl_s: int) -> None:
+        self._r = client
+        self._ttl = ttl_s or None
+
+    @staticmethod
+    def _key(thread_id: str) -> str:
+        return f"plan:{thread_id}"
+
+    @staticmethod
+    def _index_key(profile_id: str) -> str:
+        return f"plan_index:{profile_id}"
+
+    @staticmethod
+    def _decode(raw: Dict[Any, Any]) -> Optional[Dict[str, Any]]:
+        if not raw:
+            return None
+        return {(k.decode() if isinstance(k, bytes) else k): _loads(v) for k, v in raw.items()}
+
+    def get(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        return self._decode(self._r.hgetall(self._key(thread_id)))
+
+    def version(self, thread_id: str) -> int:
+        return int(self._r.get(f"plan_ver:{thread_id}") or 0)
+
+    def _write(self, thread_id: str, mapping: Dict[str, Any], replace: bool) -> None:
+        key = self._key(thread_id)
+        idx = self._index_key(_profile_of(thread_id))
+        pipe = self._r.pipeline()
+        if replace:
+            pipe.delete(key)
+        if mapping:
+            pipe.hset(key, mapping={k: _dumps(v) for k, v in mapping.items()})
+        pipe.sadd(idx, thread_id)
+        pipe.incr(f"plan_ver:{thread_id}")
+        if self._ttl:
+            pipe.expire(key, self._ttl)
+            pipe.expire(f"plan_ver:{thread_id}", self._ttl)
+            pipe.expire(idx, self._ttl)
+        pipe.execute()
+
+    def __setitem__(self, thread_id: str, plan: Dict[str, Any]) -> None:
+        self._write(thread_id, plan, replace=True)
+
+    def update_fields(self, thread_id: str, plan: Dict[str, Any], fields: Iterable[str]) -> None:
+        """Serialize and write only the touched top-level keys instead of the whole plan."""
+        self._write(thread_id, {f: plan[f] for f in fields if f in plan}, replace=False)
+
+    def field_for_profile(self, profile_id: str, kind: str, field: str) -> Iterator[Tuple[str, Any]]:
+        """Fetch one hash field per thread (pipelined HGET) instead of whole plans."""
+        prefix = f"{profile_id}:{kind}:"
+        members = (m.decode() if isinstance(m, bytes) else m for m in self._r.smembers(self._index_key(profile_id)))
+        tids = sorted(t for t in members if t.startswith(prefix))
+        if not tids:
+            return
+        pipe = self._r.pipeline()
+        for t in tids:
+            pipe.hget(self._key(t), field)
+        for tid, raw in zip(tids, pipe.execute()):
+            yield tid, (_loads(raw) if raw is not None else None)
+
+
+@lru_cache(maxsize=1)
+def redis_client() -> Any:
+    """Shared Redis client when REDIS_URL is set and redis is installed, else None."""
+    redis = _import_redis() if settings.REDIS_URL else None
+    return redis.Redis.from_url(settings.REDIS_URL) if redis is not None else None
+
+
+def make_plan_store():
+    """Return a Redis store when REDIS_URL is set and redis is installed, else in-memory."""
+    client = redis_client()
+    if client is None:
+        return MemoryPlanStore()
+    return RedisPlanStore(client, settings.PLAN_TTL_S)
@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+
+
+def _parse_birthday(value: Optional[str]) -> Tuple[Optional[Tuple[int, int]], Optional[int]]:
+    """Split MM-DD / YYYY-MM-DD into ((month, day), year-or-None); (None, None) if unparseable."""
+    if not value:
+        return None, None
+    try:
+        if len(value) == 10:
+            d = date.fromisoformat(value)
+            return (d.month, d.day), d.year
+        d = date.fromisoformat(f"2000-{value}")  # leap year so 02-29 survives
+        return (d.month, d.day), None
+    except Exception:
+        return None, None
+
+
+@dataclass(slots=True, frozen=True)
+class Contact:
+    name: Optional[str]
+    relation: Optional[str]
+    birthday: Optional[str]
+    # Lower-cased, stripped relation for matching (computed once at upsert)
+    relation_norm: str = ""
+    # Pre-parsed birthday; bday_year is set only for full YYYY-MM-DD dates
+    bday_md: Optional[Tuple[int, int]] = None
+    bday_year: Optional[int] = None
+
+
+def _contact(name: Optional[str], relation: Optional[str], birthday: Optional[str], relation_norm: str = "") -> Contact:
+    md, year = _parse_birthday(birthday)
+    return Contact(name=name, relation=relation, birthday=birthday, relation_norm=relation_norm, bday_md=md, bday_year=year)
+
+
+@dataclass(slots=True, frozen=True)
+class Profile:
+    """Typed view of a profile_json dict, built once at upsert instead of per request."""
+    profile_id: str
+    data: Dict[str, Any]
+    family: Tuple[Contact, ...]
+    colleagues: Tuple[Contact, ...]
+
+    @classmethod
+    def from_json(cls, profile_id: str, data: Dict[str, Any]) -> "Profile":
+        meta = (data or {}).get("meta", {}) or {}
+        family = tuple(
+            _contact(f.get("name"), f.get("relation", "family"), f.get("birthday"), (f.get("relation") or "").strip().lower())
+            for f in meta.get("family", []) or []
+        )
+        colleagues = tuple(
+            _contact(c.get("name"), c.get("role", "colleague"), c.get("birthday"))
+            for c in meta.get("colleagues", []) or []
+        )
+        return cls(profile_id=profile_id, data=data, family=family, colleagues=colleagues)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Raw profile dict for agents/graphs that still take plain dicts."""
+        return self.data
@@ -1,6 +1,10 @@
 from __future__ import annotations
 from typing import Any, Dict, List, Tuple
+import heapq, re
+from bisect import bisect_right
+from operator import itemgetter
 from app.llm.llm import get_llm, _safe_text
+from app.jsoncodec import dumps_str as _dumps, loads as _loads
 
 MODEL_VERSION = "recs-2025-08-llm1"
 
@@ -18,6 +22,8 @@ RERANK_SYSTEM = (
 
 KID_KEYWORDS = {"kid", "kids", "child", "children", "family", "arcade", "game", "park", "museum", "science", "comics", "lego", "play"}
 ADULT_EXCLUDE = {"bar", "nightlife", "club", "alcohol", "cocktail", "wine", "pub"}
+# Any ADULT_EXCLUDE keyword as a case-insensitive substring ("bars", "pubs" match too)
+_ADULT_RE = re.compile("|".join(map(re.escape, sorted(ADULT_EXCLUDE))), re.IGNORECASE)
 
 
 def _fallback_themes() -> List[Dict[str, Any]]:
@@ -28,9 +34,12 @@ def _fallback_themes() -> List[Dict[str, Any]]:
     ]
 
 
+_MINOR_RE = re.compile("parent|child|son|daughter|kid", re.IGNORECASE)
+
+
 def _minor_context(event: Dict[str, Any]) -> bool:
-    rel = (event.get("relationshipType") or "").lower()
-    return any(tok in rel for tok in ["parent", "child", "son", "daughter", "kid"])
+    # Case-insensitive substring match, so "grandparent" or "stepson" count too
+    return _MINOR_RE.search(event.get("relationshipType") or "") is not None
 
 
 def _normalize_theme(t: Dict[str, Any]) -> Dict[str, Any]:
@@ -51,9 +60,9 @@ def _normalize_theme(t: Dict[str, Any]) -> Dict[str, Any]:
 def _filter_kid_safe(themes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     safe: List[Dict[str, Any]] = []
     for t in themes:
-        text = (t.get("title", "") + " " + t.get("description", "")).lower()
+        text = t.get("title", "") + " " + t.get("description", "")
         tags = set(t.get("tags") or [])
-        if any(a in text for a in ADULT_EXCLUDE) or (tags & ADULT_EXCLUDE):
+        if _ADULT_RE.search(text) or (tags & ADULT_EXCLUDE):
             continue
         safe.append(t)
     return safe
@@ -64,15 +73,14 @@ def generate_themes(profile: Dict[str, Any], event: Dict[str, Any], n: int) -> L
     if not llm:
         return _fallback_themes()[:n]
     try:
-        import json
         prompt = (
             THEME_SYSTEM
-            + "\nProfile:" + json.dumps(profile)
-            + "\nEvent:" + json.dumps(event)
+            + "\nProfile:" + _dumps(profile)
+            + "\nEvent:" + _dumps(event)
             + f"\nReturn strictly JSON with key 'themes' (max {n})."
         )
         resp = llm.invoke(prompt)
-        data = json.loads(_safe_text(resp) or "{}")
+        data = _loads(_safe_text(resp) or "{}")
         themes = data.get("themes") or []
         if not isinstance(themes, list):
             return _fallback_themes()[:n]
@@ -89,46 +97,69 @@ def generate_themes(profile: Dict[str, Any], event: Dict[str, Any], n: int) -> L
         return _fallback_themes()[:n]
 
 
+_MINOR_RELATIONS = ("parent", "child", "son", "daughter")
+_KID_TAGS = frozenset({"kid_friendly", "family", "games", "arcade", "park", "museum"})
+_ROMANTIC_TAGS = frozenset({"romantic", "intimate", "cozy"})
+_ADULT_TAGS = frozenset(ADULT_EXCLUDE)
+# (tag group, delta) adjustments by event bucket; a group applies once if any of its tags is present
+_HEAD_RULES = {
+    "small": ((frozenset({"large_group"}), -0.1),),
+    "mid": (),
+    "large": ((frozenset({"intimate"}), -0.1),),
+}
+_BUDGET_RULES = {
+    0: (),
+    1: ((frozenset({"budget_friendly", "casual"}), 0.1),),
+    2: (),
+    3: ((frozenset({"premium", "classy"}), 0.1),),
+}
+
+
+def _head_bucket(head: int) -> str:
+    return "large" if head >= 8 else ("small" if head <= 4 else "mid")
+
+
+def _budget_bucket(budget: float) -> int:
+    return 0 if not budget else (1 if budget <= 25 else (3 if budget >= 75 else 2))
+
+
+def _theme_rules(rel: str, closeness: float, tod: str, head: int, budget: float) -> Tuple[Tuple[frozenset, float], ...]:
+    """Resolve one event's scoring signals into a flat (tag group, delta) table, in scoring order."""
+    rules: List[Tuple[frozenset, float]] = []
+    # Relationship signals
+    if any(x in rel for x in _MINOR_RELATIONS):
+        rules += [(_KID_TAGS, 0.2), (_ADULT_TAGS, -0.5)]
+    if "partner" in rel or "spouse" in rel:
+        rules.append((_ROMANTIC_TAGS, 0.15 * (0.5 + closeness)))
+    # Time of day
+    if tod:
+        rules.append((frozenset({tod}), 0.1))
+    if tod == "evening":
+        rules.append((frozenset({"brunch"}), -0.1))
+    # Headcount sizing and budget fit (very rough)
+    rules += _HEAD_RULES[_head_bucket(head)]
+    rules += _BUDGET_RULES[_budget_bucket(budget)]
+    return tuple(rules)
+
+
+def _score_theme(t: Dict[str, Any], rules: Tuple[Tuple[frozenset, float], ...]) -> float:
+    s = float(t.get("score") or 0.5)
+    tags = set(t.get("tags") or [])
+    for group, delta in rules:
+        if not group.isdisjoint(tags):
+            s += delta
+    return s
+
+
 def rerank_themes(themes: List[Dict[str, Any]], profile: Dict[str, Any], event: Dict[str, Any]) -> List[Dict[str, Any]]:
     rel = (event.get("relationshipType") or "").lower()
     closeness = float(event.get("closenessScore") or 0.5)
     tod = (event.get("timeOfDay") or "").lower()
     head = int(event.get("headcount") or 2)
     budget = float(event.get("budgetPerPerson") or 0)
-
-    def score_theme(t: Dict[str, Any]) -> float:
-        s = float(t.get("score") or 0.5)
-        tags = set(t.get("tags") or [])
-        # Relationship signals
-        if any(x in rel for x in ["parent", "child", "son", "daughter"]):
-            if tags & {"kid_friendly", "family", "games", "arcade", "park", "museum"}:
-                s += 0.2
-            if tags & ADULT_EXCLUDE:
-                s -= 0.5
-        if "partner" in rel or "spouse" in rel:
-            if tags & {"romantic", "intimate", "cozy"}:
-                s += 0.15 * (0.5 + closeness)
-        # Time of day
-        if tod and tod in tags:
-            s += 0.1
-        if tod == "evening" and ("brunch" in tags):
-            s -= 0.1
-        # Headcount sizing (very rough)
-        if head >= 8 and ("intimate" in tags):
-            s -= 0.1
-        if head <= 4 and ("large_group" in tags):
-            s -= 0.1
-        # Budget rough fit
-        if budget:
-            if budget <= 25 and ("budget_friendly" in tags or "casual" in tags):
-                s += 0.1
-            if budget >= 75 and ("premium" in tags or "classy" in tags):
-                s += 0.1
-        return s
-
-    scored = [ (score_theme(t), t) for t in themes ]
-    scored.sort(key=lambda x: x[0], reverse=True)
-    return [t for _, t in scored]
+    # Per-event signals are resolved once into a rule table, not re-branched per theme
+    rules = _theme_rules(rel, closeness, tod, head, budget)
+    return sorted(themes, key=lambda t: _score_theme(t, rules), reverse=True)
 
 
 def make_home_theme(event: Dict[str, Any]) -> Dict[str, Any]:
@@ -158,55 +189,61 @@ _TAG_QUERY_HINTS = [
     ("rooftop", "rooftop bar"),
     ("cozy", "cozy restaurant"),
 ]
+# Hint priority by key, so exact tag hits resolve with a dict lookup
+_TAG_QUERY_RANK = {key: i for i, (key, _) in enumerate(_TAG_QUERY_HINTS)}
 
 
 def build_query_from_theme(theme: Dict[str, Any], event: Dict[str, Any]) -> str:
-    tags = [str(t).lower() for t in (theme.get("tags") or [])]
-    for key, q in _TAG_QUERY_HINTS:
+    tags = {str(t).lower() for t in (theme.get("tags") or [])}
+    # Earlier hints still win via substring match, so only those ahead of the best exact hit are scanned
+    best = min((_TAG_QUERY_RANK[t] for t in tags if t in _TAG_QUERY_RANK), default=len(_TAG_QUERY_HINTS))
+    for key, q in _TAG_QUERY_HINTS[:best]:
         if any(key in t for t in tags):
             return q
+    if best < len(_TAG_QUERY_HINTS):
+        return _TAG_QUERY_HINTS[best][1]
     # Fallback to title keywords
     return theme.get("title", "restaurant")
 
 
+# Per-person budget upper bounds for price levels 1-3; anything above is level 4
+_PRICE_BUDGET_THRESHOLDS = (20.0, 40.0, 80.0)
+
+
 def price_from_budget(budget_per_person: Any) -> int | None:
     try:
         b = float(budget_per_person)
     except Exception:
         return None
-    if b < 20:
-        return 1
-    if b < 40:
-        return 2
-    if b < 80:
-        return 3
-    return 4
+    return bisect_right(_PRICE_BUDGET_THRESHOLDS, b) + 1
+
+
+def _heuristic_venue_score(v: Dict[str, Any]) -> float:
+    rating = float(v.get("rating") or 0)
+    price = v.get("price") or 2
+    price_penalty = 0.1 * max(0, (price or 0) - 2)
+    return max(0.0, min(1.0, (rating / 5.0) - price_penalty))
 
 
 def rerank_venues(profile: Dict[str, Any], event: Dict[str, Any], theme: Dict[str, Any], venues: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
     llm = get_llm()
-    # Heuristic fallback when server LLM is disabled/unavailable
-    if not llm:
-        def h(v: Dict[str, Any]) -> float:
-            rating = float(v.get("rating") or 0)
-            price = v.get("price") or 2
-            price_penalty = 0.1 * max(0, (price or 0) - 2)
-            return max(0.0, min(1.0, (rating / 5.0) - price_penalty))
-        scored = [{**v, "matchScore": h(v), "why": "Heuristic rating/price score."} for v in venues]
-        scored.sort(key=lambda x: x.get("matchScore") or 0, reverse=True)
-        return scored[:top_k]
+    # Heuristic fallback when server LLM is disabled/unavailable, or when every venue
+    # would be returned anyway (the LLM could only reorder them, at the cost of a round trip)
+    if not llm or len(venues) <= top_k:
+        # Score once, partially select top_k, and copy only the venues that are returned
+        top = heapq.nlargest(max(top_k, 0), ((_heuristic_venue_score(v), v) for v in venues), key=itemgetter(0))
+        return [{**v, "matchScore": score, "why": "Heuristic rating/price score."} for score, v in top]
     try:
-        import json
         prompt = (
             RERANK_SYSTEM
-            + "\nProfile:" + json.dumps(profile)
-            + "\nEvent:" + json.dumps(event)
-            + "\nTheme:" + json.dumps(theme)
-            + "\nVenues:" + json.dumps(venues[:25])
+            + "\nProfile:" + _dumps(profile)
+            + "\nEvent:" + _dumps(event)
+            + "\nTheme:" + _dumps(theme)
+            + "\nVenues:" + _dumps(venues[:25])
             + f"\nReturn strictly JSON array of venues with added fields 'matchScore' (0-1) and 'why', limited to {top_k}. Preserve the 'id'."
         )
         resp = llm.invoke(prompt)
-        arr = json.loads(_safe_text(resp) or "[]")
+        arr = _loads(_safe_text(resp) or "[]")
         if not isinstance(arr, list):
             raise ValueError("bad llm result")
         keep: List[Dict[str, Any]] = []
@@ -227,6 +264,5 @@ def rerank_venues(profile: Dict[str, Any], event: Dict[str, Any], theme: Dict[st
             })
         return keep[:top_k]
     except Exception:
-        sc = sorted(venues, key=lambda v: (v.get("rating") or 0), reverse=True)
-        sc = [{**v, "matchScore": min(1.0, (v.get("rating") or 0)/5.0), "why": "Fallback by rating."} for v in sc]
-        return sc[:top_k]
+        top = heapq.nlargest(max(top_k, 0), venues, key=lambda v: (v.get("rating") or 0))
+        return [{**v, "matchScore": min(1.0, (v.get("rating") or 0)/5.0), "why": "Fallback by rating."} for v in top]
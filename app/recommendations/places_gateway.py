@@ -1,12 +1,20 @@
 from __future__ import annotations
 from typing import Any, Dict, List, Optional
-import hashlib, json, time
+import hashlib, json, threading, time
 import requests
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from app.settings import settings
+from app.plan_store import redis_client
+from app.jsoncodec import dumps as _dumps, loads as _loads
 
-# Minimal in-memory cache; replace with Redis in production
-_PLACES_CACHE: Dict[str, Dict[str, Any]] = {}
+# Bounded per-process LRU, oldest first; shared via Redis when REDIS_URL is set
+_PLACES_CACHE: "OrderedDict[Any, Dict[str, Any]]" = OrderedDict()
+_PLACES_CACHE_MAX = 1024
 _CACHE_TTL_SECONDS = 6 * 60 * 60
+_CACHE_STATS = {"hits": 0, "misses": 0}
+_CACHE_LOCK = threading.Lock()  # searches run on work-pool threads
 _GOOGLE_PLACES_URLS = {
     "text": "https://maps.googleapis.com/maps/api/place/textsearch/json",
     "nearby": "https://maps.googleapis.com/maps/api/place/nearbysearch/json",
@@ -14,40 +22,100 @@ _GOOGLE_PLACES_URLS = {
 }
 
 
-def _cache_key(params: Dict[str, Any]) -> str:
-    s = json.dumps(params, sort_keys=True)
-    return hashlib.sha256(s.encode()).hexdigest()
+def _make_session() -> requests.Session:
+    # Shared keep-alive pool so repeated searches skip the TCP+TLS handshake; retry transient 5xx
+    s = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504), allowed_methods=frozenset({"GET"}))
+    s.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry))
+    return s
+
+
+_SESSION = _make_session()
+
+
+def _normalize(params: Dict[str, Any]) -> Dict[str, Any]:
+    # Bucket coordinates to 3 decimals (~100 m) and radius to 500 m, and normalize query
+    # case/whitespace, so equivalent nearby searches share an entry
+    p = dict(params)
+    for k in ("lat", "lng"):
+        if isinstance(p.get(k), (int, float)):
+            p[k] = round(p[k], 3)
+    if isinstance(p.get("radius"), (int, float)):
+        p["radius"] = max(500, int(round(p["radius"] / 500)) * 500)
+    if isinstance(p.get("query"), str):
+        p["query"] = " ".join(p["query"].lower().split())
+    return p
+
+
+def _canon(value: Any) -> Any:
+    """Hashable, order-independent form of normalized params (the in-process cache key)."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _canon(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_canon(v) for v in value)
+    return value
+
+
+def _cache_key(p: Dict[str, Any]) -> str:
+    # Stable string key for Redis; only built when the in-process cache misses
+    s = json.dumps(p, sort_keys=True, separators=(",", ":"))
+    # Non-cryptographic use: blake2b with a short digest is cheaper than sha256 here
+    return hashlib.blake2b(s.encode(), digest_size=16).hexdigest()
 
 
 def _now() -> float:
     return time.time()
 
 
-def _get_cached(params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    k = _cache_key(params)
-    item = _PLACES_CACHE.get(k)
-    if not item:
+def _fresh(item: Dict[str, Any]) -> bool:
+    return _now() - item.get("ts", 0) <= _CACHE_TTL_SECONDS
+
+
+def _remember(k: Any, item: Dict[str, Any]) -> None:
+    with _CACHE_LOCK:
+        _PLACES_CACHE[k] = item
+        _PLACES_CACHE.move_to_end(k)
+        if len(_PLACES_CACHE) > _PLACES_CACHE_MAX:
+            _PLACES_CACHE.popitem(last=False)
+
+
+def _get_cached(k: Any, p: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    with _CACHE_LOCK:
+        item = _PLACES_CACHE.get(k)
+        if item is not None:
+            if _fresh(item):
+                _PLACES_CACHE.move_to_end(k)
+                return item
+            del _PLACES_CACHE[k]
+    r = redis_client()
+    if r is None:
         return None
-    if _now() - item.get("ts", 0) > _CACHE_TTL_SECONDS:
-        _PLACES_CACHE.pop(k, None)
+    try:
+        raw = r.get(f"places:{_cache_key(p)}")
+    except Exception:
+        return None  # cache is best-effort
+    if not raw:
         return None
+    item = _loads(raw)
+    if not _fresh(item):
+        return None
+    _remember(k, item)
     return item
 
 
-def _set_cached(params: Dict[str, Any], data: Dict[str, Any]) -> None:
-    k = _cache_key(params)
-    _PLACES_CACHE[k] = {"ts": _now(), "data": data}
+def _set_cached(k: Any, p: Dict[str, Any], data: Dict[str, Any]) -> None:
+    item = {"ts": _now(), "data": data}
+    _remember(k, item)
+    r = redis_client()
+    if r is not None:
+        try:
+            r.set(f"places:{_cache_key(p)}", _dumps(item), ex=_CACHE_TTL_SECONDS)
+        except Exception:
+            pass
 
 
 # ---------------- Google Places adapter ----------------
 
-def _build_photo_url(photo_ref: str, maxwidth: int = 800) -> str:
-    key = settings.maps_key()
-    if not key:
-        return ""
-    return f"{_GOOGLE_PLACES_URLS['photo']}?maxwidth={maxwidth}&photo_reference={photo_ref}&key={key}"
-
-
 def _google_places(params: Dict[str, Any]) -> Dict[str, Any]:
     key = settings.maps_key()
     if not key:
@@ -59,7 +127,7 @@ def _google_places(params: Dict[str, Any]) -> Dict[str, Any]:
     radius = int(params.get("radius") or 3000)
     price_level = params.get("priceLevel")
 
-    session = requests.Session()
+    session = _SESSION
     common = {"key": key}
 
     # Prefer Text Search when query is given, else Nearby Search
@@ -91,24 +159,24 @@ def _google_places(params: Dict[str, Any]) -> Dict[str, Any]:
     # Single page only (up to 20 results) to keep cost predictable
     resp = session.get(url, params=payload, timeout=8)
     resp.raise_for_status()
-    data = resp.json()
+    # Parse the raw bytes (orjson when installed) rather than decoding to text first
+    data = _loads(resp.content)
     results = data.get("results", [])
+    # Photo URL parts built once per search instead of re-reading settings per photo
+    photo_prefix, photo_suffix = f"{_GOOGLE_PLACES_URLS['photo']}?maxwidth=800&photo_reference=", f"&key={key}"
     out: List[Dict[str, Any]] = []
     for r in results:
-        photos = []
-        for ph in r.get("photos", [])[:3]:
-            ref = ph.get("photo_reference")
-            if ref:
-                photos.append(_build_photo_url(ref))
+        place_id = r.get("place_id")
+        loc = r.get("geometry", {}).get("location", {})
         out.append({
-            "id": r.get("place_id"),
+            "id": place_id,
             "name": r.get("name"),
             "address": r.get("formatted_address") or r.get("vicinity"),
-            "coords": {"lat": r.get("geometry", {}).get("location", {}).get("lat"), "lng": r.get("geometry", {}).get("location", {}).get("lng")},
+            "coords": {"lat": loc.get("lat"), "lng": loc.get("lng")},
             "price": r.get("price_level"),
             "rating": r.get("rating"),
-            "photos": photos,
-            "url": f"https://www.google.com/maps/place/?q=place_id:{r.get('place_id')}",
+            "photos": [photo_prefix + ref + photo_suffix for ref in (ph.get("photo_reference") for ph in r.get("photos", [])[:3]) if ref],
+            "url": f"https://www.google.com/maps/place/?q=place_id:{place_id}",
             "bookingUrl": None,
             "source": "google",
         })
@@ -144,7 +212,11 @@ def _mock_google_places(params: Dict[str, Any]) -> Dict[str, Any]:
 
 def search_places(params: Dict[str, Any]) -> List[Dict[str, Any]]:
     # Attempt cache
-    cached = _get_cached(params)
+    p = _normalize(params)
+    k = _canon(p)
+    cached = _get_cached(k, p)
+    with _CACHE_LOCK:
+        _CACHE_STATS["hits" if cached else "misses"] += 1
     if cached:
         return cached["data"].get("results", [])
 
@@ -156,5 +228,10 @@ def search_places(params: Dict[str, Any]) -> List[Dict[str, Any]]:
     except Exception:
         data = _mock_google_places(params)
 
-    _set_cached(params, data)
+    _set_cached(k, p, data)
     return data.get("results", [])
+
+
+def cache_stats() -> Dict[str, int]:
+    with _CACHE_LOCK:
+        return {**_CACHE_STATS, "size": len(_PLACES_CACHE)}
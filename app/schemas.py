@@ -1,6 +1,9 @@
-from pydantic import BaseModel, Field, AliasChoices
+from pydantic import BaseModel, ConfigDict, Field, AliasChoices
 from typing import Any, Dict, List, Literal, Optional, Union
 
+# Models no route references yet: build the core schema on first use instead of at import
+_COLD = ConfigDict(defer_build=True)
+
 class AgentCard(BaseModel):
     agent: str
     title: str
@@ -23,6 +26,12 @@ class PlanRequest(BaseModel):
 
     date: Optional[str] = None
 
+class WsPlanDayRequest(BaseModel):
+    """First frame of the /ws/plan/day stream; validated straight from the raw JSON text."""
+    profile_id: str
+    date: Optional[str] = None
+    supervisor_insights_bullets: Optional[List[str]] = None
+
 class AgentRunRequest(BaseModel):
     profile_id: str
     agent: Literal[
@@ -78,9 +87,15 @@ class BuildPromptRequest(BaseModel):
 class BuildPromptResponse(BaseModel):
     prompt: str
 
+class NaturalPlanResponse(BaseModel):
+    ok: bool = True
+    plan: Dict[str, Any]
+    thread_id: str
+
 # ---------------- Date/Time Update API ----------------
 
 class DateTimeUpdateRequest(BaseModel):
+    model_config = _COLD
     thread_id: str
     profile_id: str
     action: Literal["change_date", "refresh_times"]
@@ -88,6 +103,7 @@ class DateTimeUpdateRequest(BaseModel):
     current_date: Optional[str] = None  # For validation or fallback
 
 class DateTimeUpdateResponse(BaseModel):
+    model_config = _COLD
     ok: bool = True
     message: Optional[str] = None
     plan: Optional[Dict[str, Any]] = None
@@ -96,6 +112,7 @@ class DateTimeUpdateResponse(BaseModel):
 # ---------------- v1: Recommendations API models ----------------
 
 class ProfilePreferences(BaseModel):
+    model_config = _COLD
     cuisinesLiked: List[str] = Field(default_factory=list)
     cuisinesAvoided: List[str] = Field(default_factory=list)
     dietaryRestrictions: List[str] = Field(default_factory=list)
@@ -107,36 +124,43 @@ class ProfilePreferences(BaseModel):
     kidFriendly: Optional[bool] = None
 
 class ProfileBudget(BaseModel):
+    model_config = _COLD
     typicalBudgetPerPerson: Optional[Union[str, float, int]] = None  # low/med/high or numeric
 
 class ProfileInterests(BaseModel):
+    model_config = _COLD
     hobbies: List[str] = Field(default_factory=list)
     musicGenres: List[str] = Field(default_factory=list)
     activitiesLiked: List[str] = Field(default_factory=list)
     indoorOutdoorPreference: Optional[str] = None
 
 class ProfileHistoryItem(BaseModel):
+    model_config = _COLD
     date: Optional[str] = None
     themeId: Optional[str] = None
     venueId: Optional[str] = None
     feedbackScore: Optional[float] = None
 
 class ProfileConsent(BaseModel):
+    model_config = _COLD
     shareDataWithLLM: Optional[bool] = None
     marketingConsent: Optional[bool] = None
 
 class ProfileLLMHelpers(BaseModel):
+    model_config = _COLD
     personaSummary: Optional[str] = None
     personaTags: List[str] = Field(default_factory=list)
     vectorEmbeddingId: Optional[str] = None
 
 class Location(BaseModel):
+    model_config = _COLD
     lat: Optional[float] = None
     lng: Optional[float] = None
     city: Optional[str] = None
     country: Optional[str] = None
 
 class ProfileModel(BaseModel):
+    model_config = _COLD
     profileId: str = Field(validation_alias=AliasChoices("profile_id", "profileId"))
     name: Optional[str] = None
     birthdate: Optional[str] = None
@@ -165,6 +189,7 @@ class ProfileModel(BaseModel):
     llm: Optional[ProfileLLMHelpers] = None
 
 class EventModel(BaseModel):
+    model_config = _COLD
     eventId: Optional[str] = None
     profileId: str = Field(validation_alias=AliasChoices("profile_id", "profileId"))
     # Event context
@@ -195,6 +220,7 @@ class EventModel(BaseModel):
     surpriseOk: Optional[bool] = None
 
 class Theme(BaseModel):
+    model_config = _COLD
     id: str
     title: str
     description: str
@@ -203,10 +229,12 @@ class Theme(BaseModel):
     score: Optional[float] = None
 
 class Coords(BaseModel):
+    model_config = _COLD
     lat: float
     lng: float
 
 class Venue(BaseModel):
+    model_config = _COLD
     id: str
     name: str
     address: Optional[str] = None
@@ -221,11 +249,13 @@ class Venue(BaseModel):
     source: Optional[str] = None  # google|yelp|mock
 
 class RecommendationsRequest(BaseModel):
+    model_config = _COLD
     topKThemes: int = 5
     topKVenues: int = 10
     forceRefresh: bool = False
 
 class RecommendationsResponse(BaseModel):
+    model_config = _COLD
     themes: List[Theme]
     venues: List[Venue]
     usedTools: List[str] = Field(default_factory=list)
@@ -234,24 +264,28 @@ class RecommendationsResponse(BaseModel):
     recId: Optional[str] = None
 
 class CreateJobRequest(BaseModel):
+    model_config = _COLD
     eventId: str
     topKThemes: int = 5
     topKVenues: int = 10
     forceRefresh: bool = False
 
 class JobStatusResponse(BaseModel):
+    model_config = _COLD
     jobId: str
     status: Literal["pending", "running", "complete", "failed"]
     result: Optional[RecommendationsResponse] = None
     error: Optional[str] = None
 
 class FeedbackRequest(BaseModel):
+    model_config = _COLD
     recId: Optional[str] = None
     thumbs: Literal["up", "down"]
     chosenItems: List[str] = Field(default_factory=list)  # theme or venue ids
     reasons: Optional[str] = None
 
 class VenuesSearchRequest(BaseModel):
+    model_config = _COLD
     query: Optional[str] = None
     lat: float
     lng: float
@@ -296,6 +330,8 @@ class SimStatusResponse(BaseModel):
     thread_id: str
     now: Optional[str] = None
     tasks: List[TimelineTask] = Field(default_factory=list)
+    # Plan write counter; pass back as ?since= to get 304 when nothing changed
+    version: Optional[int] = None
 
 # ---------------- Organized REST: Birthday endpoints ----------------
 
@@ -334,6 +370,10 @@ class InvitesToneRequest(BaseModel):
 class InvitesTextRequest(BaseModel):
     template: str
 
+class BirthdayBatchRequest(BaseModel):
+    # Same action dicts as NaturalCommandRequest.client_action, applied in order
+    actions: List[Dict[str, Any]] = Field(default_factory=list)
+
 # ---------------- Master Orchestrator ----------------
 
 class OrchestrateRequest(BaseModel):
@@ -9,6 +9,19 @@ class Settings(BaseSettings):
     # "client" = never call LLMs on the server, return prompts/fallbacks instead
     # "server" = call the configured LLM from the backend (for local/dev only)
     LLM_MODE: str = "server"
+    # Invoke graphs/agent nodes once at startup to shift first-request latency to boot
+    WARMUP_ENABLED: bool = True
+    # Mount ./static for the quick test UI when the directory exists
+    STATIC_ENABLED: bool = True
+    # Optional shared plan store; falls back to in-process memory when unset
+    REDIS_URL: str | None = None
+    PLAN_TTL_S: int = 7 * 24 * 3600
+    # Threads for sync graph/agent/LLM/Places work offloaded from async handlers
+    WORK_POOL_SIZE: int = 16
+    # Offloaded calls allowed to run or queue on that pool at once; further callers wait
+    WORK_MAX_PENDING: int = 64
+    # Expose /api/debug/stats (cache counters); keep off in production
+    DEBUG_ENDPOINTS: bool = False
 
     def maps_key(self) -> str | None:
         return self.GOOGLE_MAPS_API_KEY or self.GOOGLE_API_KEY
@@ -1,7 +1,12 @@
 from typing import Dict, Any
+from operator import itemgetter
+
+_NO_BLOCKS: Dict[str, Any] = {}  # shared read-only default; never mutated
 
 def calendar_lookup(profile: Dict[str, Any], date: str) -> Dict[str, Any]:
-    day_key = next(iter(profile.get("days", {"Day_1": {}})))
-    blocks = profile.get("days", {}).get(day_key, {})
-    items = [{"time": t, "title": v} for t, v in sorted(blocks.items())]
+    # One lookup of "days"; a missing or empty schedule means no events
+    days = profile.get("days")
+    blocks = (days[next(iter(days))] or _NO_BLOCKS) if days else _NO_BLOCKS
+    # Keys are unique, so order by time alone instead of comparing whole (time, title) tuples
+    items = [{"time": t, "title": v} for t, v in sorted(blocks.items(), key=itemgetter(0))]
     return {"events": items}
@@ -1,14 +1,20 @@
-from typing import List, Dict, Any
-import re
+from typing import List, Dict, Any, Optional, Tuple
+from functools import lru_cache
+import re, string, sys
 from app.llm.llm import get_llm
 
 class _SafeDict(dict):
+    __slots__ = ()  # no per-instance __dict__ for the per-call wrapper
+
     def __missing__(self, key):
         # Leave unknown placeholders intact
         return "{" + key + "}"
 
 def compose_message(template: str, params: Dict[str, str]) -> str:
     """Safely fill placeholders; unknown keys remain as-is."""
+    segments = _parse_template(template)
+    if segments is not None:
+        return _render_segments(segments, params)
     try:
         return template.format_map(_SafeDict(params))
     except Exception:
@@ -18,6 +24,37 @@ def compose_message(template: str, params: Dict[str, str]) -> str:
             msg = msg.replace("{" + k + "}", v)
         return msg
 
+_FORMATTER = string.Formatter()
+
+
+@lru_cache(maxsize=256)
+def _parse_template(template: str) -> Optional[Tuple[Tuple[str, Optional[str]], ...]]:
+    """Split a template into (literal, field) segments once; None if it needs full str.format handling."""
+    try:
+        parsed = list(_FORMATTER.parse(template))
+    except ValueError:
+        return None
+    segments = []
+    for literal, field, spec, conv in parsed:
+        if field is not None and (spec or conv or not field.isidentifier()):
+            return None
+        segments.append((literal, sys.intern(field) if field else None))
+    return tuple(segments)
+
+
+def _render_segments(segments: Tuple[Tuple[str, Optional[str]], ...], params: Dict[str, Any]) -> str:
+    # Same contract as compose_message: unknown keys remain as-is
+    return "".join(
+        lit + (str(params[f]) if f in params else "{" + f + "}") if f else lit
+        for lit, f in segments
+    )
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Hit/miss counters for the invite rewrite and template-parse caches."""
+    def _lru(fn):
+        ci = fn.cache_info(); return {"hits": ci.hits, "misses": ci.misses, "size": ci.currsize}
+    return {"invite_rewrite": _lru(_rewrite_cached), "invite_template": _lru(_parse_template)}
+
 def send_invites(invitees: List[str], message: str) -> Dict[str, any]:
     return {"sent": len(invitees), "failed": [], "preview": message[:180]}
 
@@ -43,37 +80,51 @@ def build_rewrite_invite_prompt(style: str, brevity: str, current_template: str)
 
 
 def _safe_content(resp: Any) -> str:
-    try:
-        text = getattr(resp, "content", None)
-        return text if isinstance(text, str) else (str(resp) if resp is not None else "")
-    except Exception:
-        return ""
+    # Chat responses carry a str .content; anything else is stringified whole
+    text = getattr(resp, "content", None)
+    if type(text) is str:
+        return text
+    return str(resp) if resp is not None else ""
 
 
 def rewrite_invite_template(style: str, brevity: str, current_template: str, constraints: Dict[str, str]) -> str:
     """Rewrite invite template with tone/brevity; preserve placeholders like {name},{guest},{spouse},{date},{venue},{rsvp}."""
     llm = get_llm()
     if llm is None:
-        # Simple deterministic tweaks
-        t = current_template.strip()
-        if brevity == "short":
-            t = re.sub(r"\s*\n\s*", " ", t)
-            # Keep first sentence if present
-            m = re.match(r"(.+?[.!?])\s", t)
-            if m:
-                t = m.group(1)
-        if style == "playful":
-            t = ("🎉 " + t.replace("You are invited", "You're invited").replace("You are", "You're") + " 🎂").strip()
-        elif style == "formal":
-            t = t.replace("Hi", "Dear").replace("Hey", "Dear").replace("You're", "You are")
-        elif style == "romantic":
-            t = ("❤️ " + t + " ❤️").strip()
-        elif style == "friendly":
-            t = t
-        elif style == "professional":
-            t = t
-        return t
+        # constraints don't reach the rewrite (placeholders stay unfilled), so they're not part of the key
+        return _rewrite_cached(style, brevity, current_template)
+    return _rewrite_llm(llm, style, brevity, current_template)
+
+
+_LINE_BREAKS_RE = re.compile(r"\s*\n\s*")
+_FIRST_SENTENCE_RE = re.compile(r"(.+?[.!?])\s")
+
+
+# Only the deterministic no-LLM rewrite is memoized; asking the LLM again should give a fresh take
+@lru_cache(maxsize=1024)
+def _rewrite_cached(style: str, brevity: str, current_template: str) -> str:
+    # Simple deterministic tweaks
+    t = current_template.strip()
+    if brevity == "short":
+        t = _LINE_BREAKS_RE.sub(" ", t)
+        # Keep first sentence if present
+        m = _FIRST_SENTENCE_RE.match(t)
+        if m:
+            t = m.group(1)
+    if style == "playful":
+        t = ("🎉 " + t.replace("You are invited", "You're invited").replace("You are", "You're") + " 🎂").strip()
+    elif style == "formal":
+        t = t.replace("Hi", "Dear").replace("Hey", "Dear").replace("You're", "You are")
+    elif style == "romantic":
+        t = ("❤️ " + t + " ❤️").strip()
+    elif style == "friendly":
+        t = t
+    elif style == "professional":
+        t = t
+    return t
+
 
+def _rewrite_llm(llm: Any, style: str, brevity: str, current_template: str) -> str:
     prompt = build_rewrite_invite_prompt(style, brevity, current_template)
     # Note: Avoid system role; model uses human messages
     resp = llm.invoke(prompt)
@@ -1,10 +1,16 @@
-from typing import List
+from typing import List, Tuple
+from functools import lru_cache
 
-def spotify_recs(mood: str, genre: str) -> List[str]:
+@lru_cache(maxsize=256)
+def _spotify_titles(mood: str, genre: str) -> Tuple[str, ...]:
     base = [f"{genre.title()} Mix #{i}" for i in range(1, 5)]
     if mood == "focus": base.append("Deep Work Instrumentals")
     if mood == "relax": base.append("Evening Chillout")
-    return base
+    return tuple(base)
+
+def spotify_recs(mood: str, genre: str) -> List[str]:
+    # Titles are formatted once per (mood, genre); callers still get their own list
+    return list(_spotify_titles(mood, genre))
 
 def movie_recs(taste: str) -> List[str]:
     return [f"Top pick for {taste}", "Critically Acclaimed 2025", "Trending on OTT"]